@@ -1,5 +1,7 @@
 from .base_sys import BaseSystem
 from .linear_sys import LinearSystem
+from .linear_sys_batch import LinearSystemBatch
+from .disturbance_stream import DisturbanceStream
 from .schemas import *
 
-__all__ = ["BaseSystem", "LinearSystem"]
\ No newline at end of file
+__all__ = ["BaseSystem", "LinearSystem", "LinearSystemBatch", "DisturbanceStream"]
\ No newline at end of file
@@ -0,0 +1,63 @@
+import numpy as np
+from typing import Literal, Optional, Union, Tuple
+from OpenCtrl.rng import SeedLike, make_rng
+
+def assert_params(**args):
+    if 'block_size' in args:
+        if not isinstance(args['block_size'], int):
+            raise TypeError(f"block_size must be an integer but got {type(args['block_size'])}")
+        if args['block_size'] <= 0:
+            raise ValueError(f"block_size must be a positive integer but got {args['block_size']}")
+    if 'batch_shape' in args:
+        if not isinstance(args['batch_shape'], tuple):
+            raise TypeError(f"batch_shape must be a tuple but got {type(args['batch_shape'])}")
+
+class DisturbanceStream:
+    '''
+    Pre-drawn disturbance blocks for LinearSystem.step. block_size draws are generated in one
+    Generator call into a contiguous scratch array, scaled in place and written into a zero padded
+    ring of shape (block_size, *batch_shape, sys_dim); next() hands out one row of it as a view.
+    A row is overwritten when the ring is refilled, i.e. block_size calls later, so callers that
+    keep phi around longer must copy it.
+    '''
+    def __init__(self,
+                 sys_dim : int,
+                 disturbance_dim : int,
+                 disturbance_type : Optional[Literal['normal', 'uniform', 'exponential']] = 'normal',
+                 disturbance_scale : Optional[Union[Tuple[Union[float,int]],Union[float, int]]] = [0, 1],
+                 block_size : Optional[int] = 1024,
+                 batch_shape : Optional[Tuple[int, ...]] = (),
+                 seed : SeedLike = None
+                 ) -> None:
+        assert_params(block_size = block_size, batch_shape = batch_shape)
+        self.sys_dim = sys_dim
+        self.disturbance_dim = disturbance_dim
+        self.disturbance_type = disturbance_type
+        self.disturbance_scale = disturbance_scale
+        self.block_size = block_size
+        self.rng = make_rng(seed)
+        self.buffer = np.zeros((block_size,) + batch_shape + (sys_dim,))
+        self._scratch = np.empty((block_size,) + batch_shape + (disturbance_dim,))
+        self.index = block_size
+
+    def refill(self) -> None:
+        if self.disturbance_type == 'normal':
+            loc, scale = self.disturbance_scale
+            self.rng.standard_normal(out = self._scratch)
+        elif self.disturbance_type == 'uniform':
+            loc, scale = self.disturbance_scale[0], self.disturbance_scale[1] - self.disturbance_scale[0]
+            self.rng.random(out = self._scratch)
+        else:
+            loc, scale = 0, self.disturbance_scale
+            self.rng.standard_exponential(out = self._scratch)
+        active = self.buffer[..., :self.disturbance_dim]
+        np.multiply(self._scratch, scale, out = active)
+        active += loc
+        self.index = 0
+
+    def next(self) -> np.ndarray:
+        if self.index == self.block_size:
+            self.refill()
+        phi = self.buffer[self.index]
+        self.index += 1
+        return phi
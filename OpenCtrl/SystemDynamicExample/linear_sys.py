@@ -1,7 +1,9 @@
 import numpy as np
 from typing import Literal, Optional, List, Union, Tuple
 from .base_sys import BaseSystem
-from .schemas import InputSpaceRandom, InputSpaceContinuous, InputSpaceDiscrete
+from .schemas import InputSpaceRandom, InputSpaceContinuous, InputSpaceDiscrete, InputSpaceTable
+from .disturbance_stream import DisturbanceStream
+from OpenCtrl.rng import SeedLike, make_rng
 def assert_inputs(**args):
     if 'sys_type' in args:
         if not isinstance(args['sys_type'], str):
@@ -55,6 +57,15 @@ def assert_inputs(**args):
         if args['disturbance_type'] not in ['normal', 'uniform', 'exponential']:
             raise ValueError(f"disturbance_type must be 'normal', 'uniform', or 'exponential' but got {args['disturbance_type']}")
 
+    if 'stream_block' in args and args['stream_block'] is not None:
+        if not isinstance(args['stream_block'], int):
+            raise TypeError(f"stream_block must be an integer or None but got {type(args['stream_block'])}")
+        if args['stream_block'] <= 0:
+            raise ValueError(f"stream_block must be a positive integer but got {args['stream_block']}")
+    if 'seed' in args and args['seed'] is not None:
+        if not isinstance(args['seed'], (int, np.random.SeedSequence, np.random.Generator)):
+            raise TypeError(f"seed must be an integer, np.random.SeedSequence, np.random.Generator or None but got {type(args['seed'])}")
+
     if 'disturbance_scale' in args:
         if args['disturbance_type'] == 'exponential':
             if not isinstance(args['disturbance_scale'], (int, float)):
@@ -77,7 +88,9 @@ class LinearSystem(BaseSystem):
                  disturbance_dim : Optional[Literal['int','full']] = 'full',
                  disturbance_type : Optional[ Literal['normal', 'uniform', 'exponential'] ] = 'normal',
                  disturbance_scale : Optional[Union[Tuple[Union[float,int]],Union[float, int]]] = [0, 1],
-                 disturbance_params : Optional[List[Union[float, int]]] = None
+                 disturbance_params : Optional[List[Union[float, int]]] = None,
+                 stream_block : Optional[int] = None,
+                 seed : SeedLike = None
                  ) -> None:
         super().__init__(sys_dim = sys_dim,
                          input_dim = input_dim,
@@ -94,8 +107,34 @@ class LinearSystem(BaseSystem):
         self._configure_input_space(self.input_space)
         self.disturbance_params = disturbance_params
         self.disturbance_scale = disturbance_scale
+        self.rng = make_rng(seed)
+        self.stream = self._make_stream(stream_block) if stream_block and disturbance_params is None else None
         self._get_disturbance()
 
+    def reseed(self,
+               seed : SeedLike
+               ) -> None:
+        '''Swap in a new random stream, e.g. a child from OpenCtrl.rng.spawn_rngs in a worker.'''
+        self.rng = make_rng(seed)
+        if self.stream is not None:
+            self.stream.rng = self.rng
+            self.stream.index = self.stream.block_size
+
+    def _stream_shape(self) -> Tuple[int, ...]:
+        return ()
+
+    def _make_stream(self,
+                     stream_block : int
+                     ) -> DisturbanceStream:
+        disturbance_dim = self.sys_dim if self.disturbance_dim == 'full' else self.disturbance_dim
+        return DisturbanceStream(sys_dim = self.sys_dim,
+                                 disturbance_dim = disturbance_dim,
+                                 disturbance_type = self.disturbance_type,
+                                 disturbance_scale = self.disturbance_scale,
+                                 block_size = stream_block,
+                                 batch_shape = self._stream_shape(),
+                                 seed = self.rng)
+
     def _configure_input_space(self,
                                 input_space : dict
                                 )-> None:
@@ -123,6 +162,7 @@ class LinearSystem(BaseSystem):
                         raise ValueError(f"input_space['discrete'] must have min, max, and step values but got {v}")
         for _ in range(self.sys_dim - len(self.u)):
             self.u.append(0)
+        self.input_table = InputSpaceTable(self.u)
     def step(self, 
              u: np.array
              ) -> None:
@@ -135,21 +175,27 @@ class LinearSystem(BaseSystem):
                 ) -> np.array:
         return self.x + u + phi
 
+    def mpc_rollout(self,
+                    U : np.ndarray,
+                    phi : np.ndarray
+                    ) -> np.ndarray:
+        '''mpc_step applied over a whole (horizon, sys_dim) input sequence via a cumulative sum.'''
+        return self.x + np.cumsum(U + phi, axis = 0)
+
     def _get_disturbance(self) -> None:
+        if self.stream is not None:
+            self.phi = self.stream.next()
+            return
         self.disturbance_dim = self.sys_dim if self.disturbance_dim == 'full'\
                                else self.disturbance_dim
         if self.disturbance_params is None:
-            comp_dim = self.sys_dim if self.disturbance_dim == self.sys_dim else self.disturbance_dim
+            self.phi = np.zeros(self.sys_dim)
             if self.disturbance_type == 'normal':
-                self.phi = np.random.normal(self.disturbance_scale[0], self.disturbance_scale[1], comp_dim)
+                self.phi[:self.disturbance_dim] = self.rng.normal(self.disturbance_scale[0], self.disturbance_scale[1], self.disturbance_dim)
             elif self.disturbance_type == 'uniform': 
-                self.phi = np.random.uniform(self.disturbance_scale[0],self.disturbance_scale[1], comp_dim)
+                self.phi[:self.disturbance_dim] = self.rng.uniform(self.disturbance_scale[0],self.disturbance_scale[1], self.disturbance_dim)
             else:
-                self._phi = np.random.exponential(self.disturbance_scale, self.input_dim)
-            inactive_dims = []
-            for _ in range(self.sys_dim - self.disturbance_dim):
-                inactive_dims.append(0)
-            self.phi = np.array(self.phi.tolist() + inactive_dims)
+                self.phi[:self.disturbance_dim] = self.rng.exponential(self.disturbance_scale, self.disturbance_dim)
         else:
             for _ in range(self.sys_dim - len(self.disturbance_params)):
                 self.disturbance_params.append(0)
@@ -0,0 +1,68 @@
+import numpy as np
+from typing import Literal, Optional, List, Union, Tuple
+from .linear_sys import LinearSystem
+from OpenCtrl.rng import SeedLike
+
+def assert_inputs(**args):
+    if 'n_systems' in args:
+        if not isinstance(args['n_systems'], int):
+            raise TypeError(f"n_systems must be an integer but got {type(args['n_systems'])}")
+        if args['n_systems'] <= 0:
+            raise ValueError(f"n_systems must be a positive integer but got {args['n_systems']}")
+
+class LinearSystemBatch(LinearSystem):
+    '''
+    Fleet of n_systems identical LinearSystem plants stepped as one array. x and phi have shape
+    (n_systems, sys_dim); step accepts an input of shape (n_systems, sys_dim) or (sys_dim,)
+    which is then applied to every plant.
+    '''
+    def __init__(self,
+                 n_systems : int,
+                 sys_dim : int,
+                 input_dim : int,
+                 input_space : dict[str,int],
+                 sys_name : str = "LinearSystemBatch",
+                 sys_type : Optional[ Literal['continuous', 'discrete'] ] = 'continuous',
+                 disturbance_dim : Optional[Literal['int','full']] = 'full',
+                 disturbance_type : Optional[ Literal['normal', 'uniform', 'exponential'] ] = 'normal',
+                 disturbance_scale : Optional[Union[Tuple[Union[float,int]],Union[float, int]]] = [0, 1],
+                 disturbance_params : Optional[List[Union[float, int]]] = None,
+                 stream_block : Optional[int] = None,
+                 seed : SeedLike = None
+                 ) -> None:
+        assert_inputs(n_systems = n_systems)
+        self.n_systems = n_systems
+        super().__init__(sys_dim = sys_dim,
+                         input_dim = input_dim,
+                         input_space = input_space,
+                         sys_name = sys_name,
+                         sys_type = sys_type,
+                         disturbance_dim = disturbance_dim,
+                         disturbance_type = disturbance_type,
+                         disturbance_scale = disturbance_scale,
+                         disturbance_params = disturbance_params,
+                         stream_block = stream_block,
+                         seed = seed)
+        self.x = np.zeros((self.n_systems, self.sys_dim))
+        self.x_o = self.x.copy()
+
+    def _stream_shape(self) -> Tuple[int, ...]:
+        return (self.n_systems,)
+
+    def _get_disturbance(self) -> None:
+        if self.stream is not None:
+            self.phi = self.stream.next()
+            return
+        self.disturbance_dim = self.sys_dim if self.disturbance_dim == 'full'\
+                               else self.disturbance_dim
+        self.phi = np.zeros((self.n_systems, self.sys_dim))
+        if self.disturbance_params is None:
+            shape = (self.n_systems, self.disturbance_dim)
+            if self.disturbance_type == 'normal':
+                self.phi[:, :self.disturbance_dim] = self.rng.normal(self.disturbance_scale[0], self.disturbance_scale[1], shape)
+            elif self.disturbance_type == 'uniform':
+                self.phi[:, :self.disturbance_dim] = self.rng.uniform(self.disturbance_scale[0], self.disturbance_scale[1], shape)
+            else:
+                self.phi[:, :self.disturbance_dim] = self.rng.exponential(self.disturbance_scale, shape)
+        else:
+            self.phi[:, :len(self.disturbance_params)] = self.disturbance_params
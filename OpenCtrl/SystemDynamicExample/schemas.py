@@ -1,3 +1,4 @@
+import numpy as np
 from typing import Literal, Optional, Union
 
 def assert_inputs(args):
@@ -68,4 +69,46 @@ class InputSpaceDiscrete(InputSpace):
         super().__init__(type='discrete', max_value=max_value, min_value=min_value)
         assert_inputs(args = {'step' : step})
         self.step = step
-        pass
\ No newline at end of file
+        pass
+
+INPUT_KINDS = {'inactive' : 0, 'continuous' : 1, 'discrete' : 2, 'random' : 3}
+
+class InputSpaceTable:
+    '''
+    system.u compiled once into contiguous per-dimension arrays: lo, hi, step (0 unless
+    discrete), kind (INPUT_KINDS code), mask (1.0 on controllable dimensions) and count (grid
+    points of a discrete dimension). clip and sample broadcast over the last axis, so
+    they take a single input vector or a whole (..., sys_dim) population.
+    '''
+    def __init__(self,
+                 spaces : list
+                 ) -> None:
+        self.lo = np.array([u.min_value if isinstance(u, InputSpace) else 0 for u in spaces], dtype = float)
+        self.hi = np.array([u.max_value if isinstance(u, InputSpace) else 0 for u in spaces], dtype = float)
+        self.step = np.array([u.step if isinstance(u, InputSpaceDiscrete) else 0 for u in spaces], dtype = float)
+        self.kind = np.array([INPUT_KINDS[u.type] if isinstance(u, InputSpace) else 0 for u in spaces], dtype = int)
+        self.active = self.kind != INPUT_KINDS['inactive']
+        self.discrete = self.kind == INPUT_KINDS['discrete']
+        self.mask = self.active.astype(float)
+        self.count = np.maximum(np.ceil((self.hi - self.lo) / np.where(self.discrete, self.step, 1)), 1).astype(int)
+
+    def __len__(self) -> int:
+        return len(self.lo)
+
+    def clip(self,
+             u : np.ndarray
+             ) -> np.ndarray:
+        '''Clamp to [lo, hi]; inactive dimensions come out as 0.'''
+        return np.clip(u, self.lo, self.hi)
+
+    def sample(self,
+               rng : np.random.Generator,
+               size : Union[int, tuple] = ()
+               ) -> np.ndarray:
+        '''Uniform draws of shape (*size, sys_dim); discrete dimensions pick a grid point.'''
+        size = (size,) if isinstance(size, int) else tuple(size)
+        population = rng.uniform(self.lo, self.hi, size = size + self.lo.shape)
+        if self.discrete.any():
+            index = rng.integers(0, self.count[self.discrete], size = size + (int(self.discrete.sum()),))
+            population[..., self.discrete] = self.lo[self.discrete] + index * self.step[self.discrete]
+        return population
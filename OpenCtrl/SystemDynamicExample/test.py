@@ -1,7 +1,9 @@
 import numpy as np
 from .base_sys import BaseSystem
 from .linear_sys import LinearSystem
-from .schemas import InputSpaceRandom, InputSpaceContinuous, InputSpaceDiscrete
+from .linear_sys_batch import LinearSystemBatch
+from .disturbance_stream import DisturbanceStream
+from .schemas import InputSpaceRandom, InputSpaceContinuous, InputSpaceDiscrete, INPUT_KINDS
 
 
 def test_base_system_initialization():
@@ -101,7 +103,87 @@ def test_linear_system_initialization():
     except Exception as e:
         print(f'here: {e}')
     
+def test_linear_system_batch():
+    fleet = LinearSystemBatch(n_systems = 4, sys_dim = 3, input_dim = 1,
+                              input_space = {'1':{'continuous': [-1.0, 1.0]}},
+                              disturbance_dim = 2,
+                              disturbance_type = 'uniform',
+                              disturbance_scale = [0, 1])
+    assert fleet.x.shape == (4, 3) and fleet.phi.shape == (4, 3),\
+        f"❌ Test failed: fleet state {fleet.x.shape} / disturbance {fleet.phi.shape} != (4, 3)"
+    assert np.all(fleet.phi[:, 2] == 0),\
+        f"❌ Test failed: inactive disturbance dimension is not zero {fleet.phi}"
+    fleet.step(np.array([0.5, 0, 0]))
+    assert np.allclose(fleet.x, np.array([0.5, 0, 0]) + fleet.phi),\
+        f"❌ Test failed: fleet step gave x = {fleet.x}"
+    try:
+        LinearSystemBatch(n_systems = 0, sys_dim = 3, input_dim = 1,
+                          input_space = {'1':{'continuous': [-1.0, 1.0]}})
+        assert False, "❌ Test failed with n_systems = 0"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    print("✅ Test passed: LinearSystemBatch steps the whole fleet")
+
+def test_disturbance_stream():
+    make = lambda : LinearSystem(sys_dim = 3, input_dim = 1,
+                                 input_space = {'1':{'continuous': [-1.0, 1.0]}},
+                                 disturbance_dim = 2,
+                                 disturbance_scale = [0, 1],
+                                 stream_block = 4,
+                                 seed = 7)
+    system, replay = make(), make()
+    trace = []
+    for _ in range(10):
+        system.step(np.zeros(3))
+        replay.step(np.zeros(3))
+        trace.append(system.phi.copy())
+    trace = np.array(trace)
+    assert np.allclose(system.x, replay.x), "❌ Test failed: seeded disturbance streams diverged"
+    assert np.all(trace[:, 2] == 0), f"❌ Test failed: inactive disturbance dimension is not zero {trace}"
+    assert len(np.unique(trace[:, 0])) == 10, "❌ Test failed: refilled blocks repeated disturbances"
+    stream = DisturbanceStream(sys_dim = 2, disturbance_dim = 2, disturbance_type = 'exponential',
+                               disturbance_scale = 2.0, block_size = 8, batch_shape = (5,), seed = 0)
+    phi = stream.next()
+    assert phi.shape == (5, 2) and np.all(phi >= 0), f"❌ Test failed: exponential stream gave {phi}"
+    fleet = LinearSystemBatch(n_systems = 4, sys_dim = 3, input_dim = 1,
+                              input_space = {'1':{'continuous': [-1.0, 1.0]}},
+                              disturbance_type = 'uniform',
+                              disturbance_scale = [2, 3],
+                              stream_block = 16)
+    assert fleet.phi.shape == (4, 3) and np.all((fleet.phi >= 2) & (fleet.phi < 3)),\
+        f"❌ Test failed: fleet stream gave {fleet.phi}"
+    try:
+        LinearSystem(sys_dim = 3, input_dim = 1,
+                     input_space = {'1':{'continuous': [-1.0, 1.0]}},
+                     stream_block = 0)
+        assert False, "❌ Test failed with stream_block = 0"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    print("✅ Test passed: DisturbanceStream serves seeded, zero padded blocks")
+
+def test_input_space_table():
+    system = LinearSystem(sys_dim = 4, input_dim = 3,
+                          input_space = {'1':{'continuous': [-1.0, 1.0]},
+                                         '2':{'discrete': [-10, 10, 2]},
+                                         '3':{'random': ['uniform', 0, 5]}})
+    table = system.input_table
+    assert np.array_equal(table.kind, [INPUT_KINDS['continuous'], INPUT_KINDS['discrete'], INPUT_KINDS['random'], 0]),\
+        f"❌ Test failed: compiled kinds {table.kind}"
+    assert np.array_equal(table.mask, [1, 1, 1, 0]) and table.count[1] == 10,\
+        f"❌ Test failed: compiled mask {table.mask} / count {table.count}"
+    population = table.sample(np.random.default_rng(0), (200, 2))
+    assert population.shape == (200, 2, 4) and np.all(population[..., 3] == 0),\
+        f"❌ Test failed: sampled population {population.shape} leaks into the inactive dimension"
+    assert np.all(population[..., 1] % 2 == 0) and np.all((population[..., 1] >= -10) & (population[..., 1] < 10)),\
+        "❌ Test failed: discrete samples are off the grid"
+    u = np.array([[3.0, 3.1, -1.0, 7.0], [-3.0, 25.0, 6.0, -7.0]])
+    assert np.allclose(table.clip(u), [[1.0, 3.1, 0.0, 0.0], [-1.0, 10.0, 5.0, 0.0]]),\
+        f"❌ Test failed: clip gave {table.clip(u)}"
+    print("✅ Test passed: InputSpaceTable compiles, clips and samples")
 
 if __name__ == "__main__":
     test_base_system_initialization()
-    test_linear_system_initialization()
\ No newline at end of file
+    test_linear_system_initialization()
+    test_linear_system_batch()
+    test_disturbance_stream()
+    test_input_space_table()
\ No newline at end of file
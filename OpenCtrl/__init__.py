@@ -3,5 +3,9 @@ from . import optim
 from . import controls
 from . import disturbances_type
 from . import verbose_cli
+from . import parallel
+from .validation import set_validation, validation_enabled
+from .rng import make_rng, spawn_seeds, spawn_rngs
+from .profiling import Profiler, NullProfiler
 
 __version__ = "1.0.16-a1"
\ No newline at end of file
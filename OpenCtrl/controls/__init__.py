@@ -1,3 +1,4 @@
 from .control_schema import ControlSchema
 from .lac import LAC
-__all__ = ["ControlSchema", "LAC"]
\ No newline at end of file
+from .recorder import TrajectoryRecorder
+__all__ = ["ControlSchema", "LAC", "TrajectoryRecorder"]
\ No newline at end of file
@@ -3,6 +3,9 @@ from OpenCtrl.SystemDynamicExample.base_sys import BaseSystem
 from OpenCtrl.disturbances_type.functionals import (baseline_disturbance,
                                            meanbasline_disturbance,
                                            ema_disturbance) 
+import numpy as np
+from OpenCtrl.validation import validation_enabled
+from OpenCtrl.rng import SeedLike, make_rng, spawn_seeds
 from typing import Literal,Optional,List
 NOMINAL_TYPES = ['baseline','mean_baseline','ema','setbased']
 def assert_inputs(**args) -> None:
@@ -22,6 +25,12 @@ def assert_inputs(**args) -> None:
             raise TypeError(f"nominal_distrubance should of type str but got {type(args['nominal_distrubance'])}")
         if not args['nominal_disturbance'].lower() in NOMINAL_TYPES:
             raise ValueError(f"nominal_disturbance should be within {NOMINAL_TYPES} but got {type(args['nominal_distrubance'])}")
+    if 'validate' in args and args['validate'] is not None:
+        if not isinstance(args['validate'], bool):
+            raise TypeError(f"validate must be a boolean or None but got {type(args['validate'])}")
+    if 'seed' in args and args['seed'] is not None:
+        if not isinstance(args['seed'], (int, np.random.SeedSequence, np.random.Generator)):
+            raise TypeError(f"seed must be an integer, np.random.SeedSequence, np.random.Generator or None but got {type(args['seed'])}")
 class ControlSchema:
     def __init__(self,
                  system : BaseSystem,
@@ -30,7 +39,9 @@ class ControlSchema:
                 nominal_disturbance : Literal['baseline',
                                               'mean_baseline',
                                               'ema',
-                                              'setbased'] = 'baseline' 
+                                              'setbased'] = 'baseline',
+                 validate : Optional[bool] = None,
+                 seed : SeedLike = None
                  ) -> None:
         args = locals()
         assert_inputs(**args)
@@ -38,6 +49,27 @@ class ControlSchema:
         self.optimizer = optimizer
         self.horizon = horizon
         self.nominal_disturbance = nominal_disturbance
+        self._validate = validate
+        self.rng = make_rng(seed)
+
+    def reseed(self,
+               seed : SeedLike
+               ) -> None:
+        '''
+        Give the controller, its system and its optimizer independent children of seed, so a
+        copied controller (e.g. in a parallel worker) does not replay its parent's streams.
+        '''
+        controller_seed, system_seed, optimizer_seed = spawn_seeds(seed, 3)
+        self.rng = make_rng(controller_seed)
+        if hasattr(self.system, 'reseed'):
+            self.system.reseed(system_seed)
+        self.optimizer.reseed(optimizer_seed)
+
+    @property
+    def validate(self) -> bool:
+        '''Whether tune checks its arguments; None at construction follows OpenCtrl.validation.'''
+        return validation_enabled() if self._validate is None else self._validate
+
     def tune(self) -> None:
         raise NotImplementedError("The tune method must be implemented in the subclass.")
     
@@ -1,16 +1,22 @@
+import time
 import numpy as np
 from .control_schema import ControlSchema
 from OpenCtrl.verbose_cli.cli import make_table
 from OpenCtrl.optim.optimizer_schema import OptimizerSchema
-from OpenCtrl.disturbances_type import baseline_disturbance
+from OpenCtrl.disturbances_type import baseline_disturbance, RollingWindow
 from OpenCtrl.SystemDynamicExample.base_sys import BaseSystem
-from typing import List, Tuple,Optional,Literal
+from OpenCtrl.rng import SeedLike
+from OpenCtrl.profiling import Profiler, NullProfiler
+from .recorder import TrajectoryRecorder
+from typing import List, Tuple,Optional,Literal,Union
 
 def assert_params(**args):
     def _listoflist_(key: str,
                      ) -> None:
+        if isinstance(args[key], np.ndarray):
+            return
         if not isinstance(args[key], list):
-            raise TypeError(f"{key} must be a type of list, found {type(args[key])}")
+            raise TypeError(f"{key} must be a type of np.ndarray or list, found {type(args[key])}")
         if not all(isinstance(element, np.ndarray) for element in args[key]):
             raise TypeError(f"Elements in {key} should be of type np.ndarray")
         
@@ -41,6 +47,20 @@ def assert_params(**args):
     if 'rho' in args:
         if not isinstance(args['rho'],(float,int)):
             raise TypeError(f"rho should be of type float or int but got {type(args['rho'])}")
+    if 'recorder' in args and args['recorder'] is not None:
+        if not isinstance(args['recorder'], TrajectoryRecorder):
+            raise TypeError(f"recorder should be an instance of TrajectoryRecorder or None but got {type(args['recorder'])}")
+    if 'profiler' in args and args['profiler'] is not None:
+        if not isinstance(args['profiler'], Profiler):
+            raise TypeError(f"profiler should be an instance of Profiler or None but got {type(args['profiler'])}")
+    if 'time_budget_ms' in args and args['time_budget_ms'] is not None:
+        if isinstance(args['time_budget_ms'], bool) or not isinstance(args['time_budget_ms'], (int, float)):
+            raise TypeError(f"time_budget_ms should be a number or None but got {type(args['time_budget_ms'])}")
+        if args['time_budget_ms'] <= 0:
+            raise ValueError(f"time_budget_ms should be in range (0,inf] but got {args['time_budget_ms']}")
+    if 'vector_psi' in args:
+        if not isinstance(args['vector_psi'],bool):
+            raise TypeError(f"vector_psi should be of type bool but got {type(args['vector_psi'])}")
     if 'beta' in args:
         if not isinstance(args['beta'],float):
             raise TypeError(f"beta should be type float but got type {type(args['beta'])}")
@@ -56,29 +76,48 @@ class LAC(ControlSchema):
                                                         'mean_baseline']] = 'baseline',
                  warmup_steps : Optional[int] = 3,
                  rho : Optional[float] = 0.93,
-                 beta : Optional[float] = 1e-3
+                 beta : Optional[float] = 1e-3,
+                 validate : Optional[bool] = None,
+                 seed : SeedLike = None,
+                 recorder : Optional[TrajectoryRecorder] = None,
+                 vector_psi : Optional[bool] = False,
+                 profiler : Optional[Profiler] = None,
+                 time_budget_ms : Optional[float] = None
                 ) -> None:
+        assert_params(recorder = recorder, vector_psi = vector_psi, profiler = profiler, time_budget_ms = time_budget_ms)
         super().__init__(system = system,
                          optimizer = optimizer,
                          horizon = horizon,
-                         nominal_disturbance = nominal_disturbance
+                         nominal_disturbance = nominal_disturbance,
+                         validate = validate,
+                         seed = seed
                          )
         self.system = system
         self.optim = optimizer
         self.horizon = horizon
         self.nominal_disturbance = nominal_disturbance
-        self.psi = np.random.uniform(low = 0, high = 1)
-        self.error_queue = []
+        # vector_psi keeps one confidence per state dimension; the blend in tune broadcasts either way
+        self.psi = self.rng.uniform(low = 0, high = 1, size = self.system.sys_dim) if vector_psi\
+            else self.rng.uniform(low = 0, high = 1)
+        self.vector_psi = vector_psi
+        self.error_queue = RollingWindow(warmup_steps, (2,) + np.shape(self.system.x))
+        self.errors = np.zeros((2,) + np.shape(self.system.x))
         self.counter = 0
         self.warmup_steps = warmup_steps
         self.rho = rho
         self.beta = beta
         self.window = None
-        self.prev_ema = np.zeros(self.system.sys_dim)
-        self.prev_real = np.zeros(self.system.sys_dim)
+        self.prev_ema = np.zeros(np.shape(self.system.x))
+        self.prev_real = np.zeros(np.shape(self.system.x))
+        self.recorder = recorder
+        self.time_budget_ms = time_budget_ms
+        self.profiler = NullProfiler() if profiler is None else profiler
+        # an optimizer without a profiler of its own reports into the controller's
+        if profiler is not None and not self.optim.profiler.enabled:
+            self.optim.profiler = profiler
     def tune(self,
-             preds: List[np.ndarray],
-             manual_nominals : Optional[List[np.ndarray]] = None,
+             preds: Union[np.ndarray, List[np.ndarray]],
+             manual_nominals : Optional[Union[np.ndarray, List[np.ndarray]]] = None,
              window_auto : Optional[bool] = True,
              window_init : Optional[float] = 0.0,
              window_size : Optional[int] = 3,
@@ -87,59 +126,95 @@ class LAC(ControlSchema):
              verbose : Optional[bool] = False,
              base_line : Optional[float] = 0.1
              ) -> Tuple[np.ndarray]:
-        assert_params(**locals())
-        if not len(preds) == self.horizon:
-            raise ValueError(f"horizon: {self.horizon} is not equal with preds : {len(preds)}")
-        if all(np.shape(_)[0] != self.system.disturbance_dim  for _ in preds):
-            raise ValueError("mismatching in dimension with provided entries in pred with disturbance_dim")
-        if manual_nominals:
-            if not len(manual_nominals) == self.horizon:
-                raise ValueError(f"length mismatch with horizon: {self.horizon} and manual_nominals: {len(manual_nominals)}")
-            if not all(len(_) == self.system.sys_dim for _ in manual_nominals):
-                raise ValueError(f"dimension of elements in manual_nominals are incorrect should system disturbance_dim : {self.system.sys_dim}")
-        blended = []
-        if self.nominal_disturbance.lower() == 'baseline':
-            self.nominal = baseline_disturbance(self.horizon,self.system.sys_dim,base_line)
-        else:
-            if not self.window:
-                self.window = [np.array([window_init for _ in range(self.system.sys_dim)]) for _ in range(window_size)] \
-                    if window_auto else manual_window
-            self.nominal = self._wrapper_disturbance(self.horizon,
-                                                window_size,
-                                                self.window,
-                                                self.prev_ema,
-                                                self.prev_real,
-                                                alpha_ema) if not manual_nominals \
-                                                else manual_nominals
+        # the budget covers the whole tick, so nominal / DCL time comes out of the optimizer's share
+        deadline = time.perf_counter() + self.time_budget_ms / 1e3 if self.time_budget_ms is not None else None
+        if self.validate:
+            assert_params(**locals())
+            if not len(preds) == self.horizon:
+                raise ValueError(f"horizon: {self.horizon} is not equal with preds : {len(preds)}")
+        preds = np.asarray(preds, dtype = float)
+        manual_nominals = np.asarray(manual_nominals, dtype = float) if manual_nominals is not None else None
+        if self.validate:
+            if np.shape(preds)[-1] != self.system.disturbance_dim:
+                raise ValueError("mismatching in dimension with provided entries in pred with disturbance_dim")
+            if manual_nominals is not None:
+                if not len(manual_nominals) == self.horizon:
+                    raise ValueError(f"length mismatch with horizon: {self.horizon} and manual_nominals: {len(manual_nominals)}")
+                if not np.shape(manual_nominals)[-1] == self.system.sys_dim:
+                    raise ValueError(f"dimension of elements in manual_nominals are incorrect should system disturbance_dim : {self.system.sys_dim}")
+        profiler = self.profiler
+        profiler.count('ticks')
+        with profiler.phase('nominal'):
+            if self.nominal_disturbance.lower() == 'baseline':
+                self.nominal = baseline_disturbance(self.horizon,self.system.sys_dim,base_line)
+                if np.ndim(self.system.x) == 2:
+                    # one baseline row per plant of a LinearSystemBatch, matching (horizon, n_systems, dim) preds
+                    self.nominal = np.repeat(self.nominal[:, None], len(self.system.x), axis = 1)
+            else:
+                if self.window is None:
+                    self.window = RollingWindow(window_size, np.shape(self.system.x), window_init) \
+                        if window_auto else RollingWindow.from_values(manual_window)
+                self.nominal = self._wrapper_disturbance(self.horizon,
+                                                    window_size,
+                                                    self.window,
+                                                    self.prev_ema,
+                                                    self.prev_real,
+                                                    alpha_ema) if manual_nominals is None \
+                                                    else manual_nominals
             
         self.counter += 1
         if self.counter >= self.warmup_steps:
-            self.dcl()
-            self.error_queue.pop()
+            with profiler.phase('dcl'):
+                self.dcl()
             self.counter = 0
-        for _ in range(self.horizon):
-            blended.append(self.psi*preds[_] + (1 - self.psi)*self.nominal[_])
-        cost,u = self.optim.optimize(blended,
-                                 verbose)
-        self.system.step(u[0])
-        self.error_queue.append([[self.system.phi - preds[0]],
-                                [self.system.phi - self.nominal[0]]])
-        if self.nominal_disturbance != 'baseline':
-            self.prev_ema = self.nominal[-1]
-            self.prev_real = self.system.phi
-            self.window.pop(0)
-            self.window.append(self.system.phi)
+        with profiler.phase('blend'):
+            blended = self.psi * preds + (1 - self.psi) * self.nominal
+        with profiler.phase('optimize'):
+            cost,u = self.optim.optimize(blended,
+                                     verbose) if deadline is None else \
+                     self.optim.optimize(blended, verbose, deadline = deadline)
+        with profiler.phase('step'):
+            self.system.step(u[0])
+            self.errors[0] = self.system.phi - preds[0]
+            self.errors[1] = self.system.phi - self.nominal[0]
+            self.error_queue.push(self.errors)
+            if self.nominal_disturbance != 'baseline':
+                self.prev_ema = self.nominal[-1]
+                self.prev_real = self.system.phi.copy()
+                self.window.push(self.prev_real)
+        if self.recorder is not None:
+            with profiler.phase('record'):
+                self.recorder.record(x = self.system.x,
+                                     phi = self.system.phi,
+                                     u = u[0],
+                                     cost = cost,
+                                     psi = self.psi,
+                                     blended = blended,
+                                     nominal = self.nominal[:self.horizon])
         if verbose:
-            display_stack = [[np.round(inp,3),np.round(c,3),np.round(b,3),np.round(n,3),np.round(self.psi,4)] for inp, c, 
-                             b,n in zip(u,cost,blended, self.nominal)]
-            display_header = ['U','COST','BLENDED','NOMINAL','PSI'] 
-            temp = make_table(display_header,display_stack)
-            display_stack = [[self.system.x,self.system.phi,temp]]
-            display_header = ['X', 'Phi', 'DETAILS'] 
-            print(make_table(display_header,display_stack)+'\n')
+            with profiler.phase('render'):
+                display_stack = [[np.round(inp,3),np.round(c,3),np.round(b,3),np.round(n,3),np.round(self.psi,4)] for inp, c, 
+                                 b,n in zip(u,cost,blended, self.nominal)]
+                display_header = ['U','COST','BLENDED','NOMINAL','PSI'] 
+                temp = make_table(display_header,display_stack)
+                display_stack = [[self.system.x,self.system.phi,temp]]
+                display_header = ['X', 'Phi', 'DETAILS'] 
+                print(make_table(display_header,display_stack)+'\n')
         return cost,u
     
+    @property
+    def converged(self) -> bool:
+        '''Whether the last tune's solves settled before max_iterations and time_budget_ms.'''
+        return getattr(self.optim, 'converged', True)
+
     def dcl(self) -> None:
+        '''
+        Confidence update from the summed prediction / nominal errors of the last warmup_steps
+        ticks. error_queue keeps them as a (warmup_steps, 2, *x.shape) ring with a running sum,
+        so the update costs O(sys_dim) whatever the warmup length. With vector_psi each
+        dimension takes its own step, without the scalar step's arange weighting (which would
+        leave dimension 0 pinned at its initial psi).
+        '''
         def delta(eML : np.array,
                   eNo : np.array
                  ) -> np.array:
@@ -151,12 +226,14 @@ class LAC(ControlSchema):
             T = np.arange(start= 0,
                           stop= self.system.sys_dim) * np.ones_like(eMl)
             return self.rho * T * (self.psi * delta(eMl,eNo) + eNo)
-        eMl = np.array([e for e_ in self.error_queue for e in e_[0]])
-        eNo = np.array([e for e_ in self.error_queue for e in e_[1]])
-        eMl = np.sum(eMl, axis = 0)
-        eNo = np.sum(eNo, axis = 0)
-        v = V(eMl,eNo)
-        self.psi -= (2 * np.dot(delta(eMl,eNo).T ,v)) / \
-                    (np.linalg.norm(v,ord = 2) + 0.03)
+        eMl, eNo = self.error_queue.sum.reshape(2, -1, self.system.sys_dim).sum(axis = 1)
+        if self.vector_psi:
+            v = self.rho * (self.psi * delta(eMl,eNo) + eNo)
+            self.psi = self.psi - (2 * delta(eMl,eNo) * v) / \
+                        (np.linalg.norm(v,ord = 2) + 0.03)
+        else:
+            v = V(eMl,eNo)
+            self.psi -= (2 * np.dot(delta(eMl,eNo).T ,v)) / \
+                        (np.linalg.norm(v,ord = 2) + 0.03)
 
         self.psi = np.clip(self.psi, 0 , 1)
@@ -0,0 +1,121 @@
+import os
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+def assert_params(**args):
+    if 'capacity' in args:
+        if not isinstance(args['capacity'], int):
+            raise TypeError(f"capacity must be an integer but got {type(args['capacity'])}")
+        if args['capacity'] <= 0:
+            raise ValueError(f"capacity must be a positive integer but got {args['capacity']}")
+    if 'path' in args and args['path'] is not None:
+        if not isinstance(args['path'], (str, os.PathLike)):
+            raise TypeError(f"path must be a string, os.PathLike or None but got {type(args['path'])}")
+
+class TrajectoryRecorder:
+    '''
+    Column store for closed-loop runs. Every record() call appends one row per column (x, phi,
+    u, cost, psi, blended, nominal for LAC) into preallocated arrays that double when full. With
+    a path, each column is an .npy file opened through np.lib.format.open_memmap, so long runs
+    are paged to disk instead of held in RAM; close() trims the files to the recorded length and
+    TrajectoryRecorder.load reopens them memory-mapped. Rows a column was not recorded for,
+    including those before its first record() call, read as NaN. Mappings are released before
+    any file is renamed or removed, so views taken from recorder[name] must not be held across
+    a record() that grows the columns or across close().
+    '''
+    def __init__(self,
+                 capacity : Optional[int] = 1024,
+                 path : Optional[str] = None
+                 ) -> None:
+        assert_params(capacity = capacity, path = path)
+        self.capacity = capacity
+        self.path = path
+        self.size = 0
+        self.columns = {}
+        if path is not None:
+            os.makedirs(path, exist_ok = True)
+
+    def _allocate(self,
+                  name : str,
+                  shape : tuple,
+                  dtype : np.dtype,
+                  capacity : int
+                  ) -> np.ndarray:
+        if self.path is None:
+            return np.empty((capacity,) + shape, dtype = dtype)
+        return np.lib.format.open_memmap(os.path.join(self.path, f"{name}.partial.npy"), mode = 'w+',
+                                         dtype = dtype, shape = (capacity,) + shape)
+
+    def _release(self,
+                 name : str
+                 ) -> Tuple[tuple, np.dtype, str]:
+        '''
+        Flush a memory-mapped column and drop the recorder's reference to it, so the mapping is
+        closed before its file is renamed or removed (which Windows refuses on a mapped file).
+        '''
+        column = self.columns.pop(name)
+        column.flush()
+        return column.shape[1:], column.dtype, column.filename
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        for name in list(self.columns):
+            if self.path is None:
+                column = self.columns[name]
+                grown = self._allocate(name, column.shape[1:], column.dtype, self.capacity)
+                grown[:self.size] = column[:self.size]
+            else:
+                shape, dtype, filename = self._release(name)
+                os.replace(filename, filename + '.old')
+                old = np.load(filename + '.old', mmap_mode = 'r')
+                grown = self._allocate(name, shape, dtype, self.capacity)
+                grown[:self.size] = old[:self.size]
+                del old
+                os.remove(filename + '.old')
+            self.columns[name] = grown
+
+    def record(self, **values) -> None:
+        if self.size == self.capacity:
+            self._grow()
+        for name, value in values.items():
+            if name not in self.columns:
+                value = np.asarray(value)
+                self.columns[name] = self._allocate(name, value.shape, np.result_type(value, float), self.capacity)
+                self.columns[name][:self.size] = np.nan
+            self.columns[name][self.size] = value
+        for name, column in self.columns.items():
+            if name not in values:
+                column[self.size] = np.nan
+        self.size += 1
+
+    def __getitem__(self, name : str) -> np.ndarray:
+        return self.columns[name][:self.size]
+
+    def as_dict(self) -> Dict[str, np.ndarray]:
+        return {name : column[:self.size] for name, column in self.columns.items()}
+
+    def close(self) -> None:
+        '''Write each memory-mapped column to <path>/<name>.npy with exactly size rows.'''
+        if self.path is None:
+            return
+        for name in list(self.columns):
+            shape, dtype, partial = self._release(name)
+            source = np.load(partial, mmap_mode = 'r')
+            final = np.lib.format.open_memmap(os.path.join(self.path, f"{name}.npy"), mode = 'w+',
+                                              dtype = dtype, shape = (self.size,) + shape)
+            final[:] = source[:self.size]
+            final.flush()
+            del final, source
+            os.remove(partial)
+            self.columns[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode = 'r')
+        self.capacity = self.size
+
+    @staticmethod
+    def load(path : str,
+             mmap_mode : Optional[str] = 'r'
+             ) -> Dict[str, np.ndarray]:
+        '''Reopen the columns written by close() without reading them into memory.'''
+        assert_params(path = path)
+        return {name[:-len('.npy')] : np.load(os.path.join(path, name), mmap_mode = mmap_mode)
+                for name in sorted(os.listdir(path))
+                if name.endswith('.npy') and not name.endswith('.partial.npy')}
@@ -1,7 +1,15 @@
+import os
+import json
+import time
+import tempfile
 import numpy as np
 from OpenCtrl.SystemDynamicExample.linear_sys import LinearSystem
+from OpenCtrl.SystemDynamicExample.linear_sys_batch import LinearSystemBatch
 from OpenCtrl.optim.vanilla_optim import VanillaOptim
+from OpenCtrl.rng import spawn_rngs
+from OpenCtrl.profiling import Profiler
 from .lac import LAC
+from .recorder import TrajectoryRecorder
 
 def _test_lac_1() -> None:
     system = LinearSystem(sys_dim = 3, input_dim = 1,
@@ -31,6 +39,235 @@ def _test_lac_1() -> None:
                                     np.array([1.0, 0.0, 0.0])],
                           verbose= True)
 
+def test_lac_fleet() -> None:
+    np.random.seed(0)
+    system = LinearSystemBatch(n_systems = 50, sys_dim = 3, input_dim = 2,
+                               input_space = {'1':{'continuous': [-5.0, 5.0]}, '2':{'continuous': [-5.0, 5.0]}},
+                               disturbance_scale = [0, 1])
+    optimizer = VanillaOptim(system = system,
+                             horizon = 3,
+                             optimizer_type = 'gradient',
+                             alpha = 0.1,
+                             max_iterations = 50)
+    lac = LAC(system = system,
+              optimizer = optimizer,
+              horizon = 3,
+              nominal_disturbance = 'mean_baseline')
+    for _ in range(5):
+        x = system.x.copy()
+        cost, u = lac.tune(preds = [np.random.normal(0, 1, (50, 3)) for _ in range(3)])
+        assert np.shape(cost) == (3, 50) and np.shape(u) == (3, 50, 3),\
+            f"❌ Test failed: fleet tune returned cost {np.shape(cost)} and u {np.shape(u)}"
+        assert np.allclose(system.x, x + u[0] + system.phi),\
+            "❌ Test failed: fleet tune did not apply u[0] to every plant"
+    assert np.ndim(lac.psi) == 0 and 0 <= lac.psi <= 1,\
+        f"❌ Test failed: fleet psi = {lac.psi} is not a scalar in [0, 1]"
+    lac = LAC(system = system, optimizer = optimizer, horizon = 3)
+    for _ in range(3):
+        cost, u = lac.tune(preds = np.random.normal(0, 1, (3, 50, 3)))
+        assert np.shape(cost) == (3, 50) and np.shape(lac.nominal) == (3, 50, 3),\
+            f"❌ Test failed: fleet tune with the baseline nominal gave cost {np.shape(cost)} and nominal {np.shape(lac.nominal)}"
+    profiler = Profiler()
+    optimizer = VanillaOptim(system = system, horizon = 3, optimizer_type = 'genetic', population_size = 20,
+                             max_iterations = 30, tolerance_step = 0, seed = 0, profiler = profiler)
+    preds = np.random.normal(0, 1, (3, 50, 3))
+    cost, u = optimizer.optimize(preds)
+    assert np.shape(cost) == (3, 50) and np.shape(u) == (3, 50, 3) and np.all(np.abs(u[..., :2]) <= 5.0),\
+        f"❌ Test failed: genetic fleet returned cost {np.shape(cost)} and u {np.shape(u)}"
+    assert profiler.counters['solves'] == 3 and profiler.counters['cost_evaluations'] == 3 * 30 * 50 * 20,\
+        f"❌ Test failed: genetic fleet was not solved as one batch per step {profiler.counters}"
+    assert np.all(cost[0] <= optimizer._batch_cost(system.x + preds[0], np.zeros((50, 3))) + 1e-9),\
+        "❌ Test failed: genetic fleet did worse than the zero input for some plant"
+    print("✅ Test passed: LAC drives a LinearSystemBatch fleet")
+
+def _seeded_lac(seed) -> LAC:
+    system = LinearSystem(sys_dim = 3, input_dim = 1,
+                          input_space = {'1':{'continuous': [-1.0, 1.0]}},
+                          seed = seed)
+    optimizer = VanillaOptim(system = system,
+                             horizon = 2,
+                             optimizer_type = 'genetic',
+                             population_size = 20,
+                             max_iterations = 20,
+                             vectorized = True,
+                             seed = seed)
+    return LAC(system = system, optimizer = optimizer, horizon = 2, seed = seed)
+
+def test_lac_seeded() -> None:
+    preds = [np.array([0.5, 0.0, 0.0]), np.array([0.5, 0.0, 0.0])]
+    runs = []
+    for global_seed in (123, 456):
+        np.random.seed(global_seed)
+        lac = _seeded_lac(7)
+        runs.append([lac.tune(preds = preds)[1][0] for _ in range(5)] + [lac.system.x.copy(), lac.psi])
+    for a, b in zip(*runs):
+        assert np.allclose(a, b), f"❌ Test failed: seeded LAC runs diverged {a} != {b}"
+    first, second = _seeded_lac(7), _seeded_lac(7)
+    first.reseed(1)
+    second.reseed(2)
+    first.tune(preds = preds)
+    second.tune(preds = preds)
+    assert not np.allclose(first.system.phi, second.system.phi),\
+        "❌ Test failed: reseeded controllers share a disturbance stream"
+    draws = [rng.random(4) for rng in spawn_rngs(0, 3, 'Philox')]
+    assert not np.allclose(draws[0], draws[1]), "❌ Test failed: spawned generators are not independent"
+    try:
+        _seeded_lac(1.5)
+        assert False, "❌ Test failed: float seed was accepted"
+    except TypeError as e:
+        print(f"✅ Test passed: {e}")
+    print("✅ Test passed: seeded LAC runs are reproducible without the global np.random state")
+
+def test_lac_recorder() -> None:
+    preds = [np.array([0.5, 0.0, 0.0]), np.array([0.5, 0.0, 0.0])]
+    with tempfile.TemporaryDirectory() as path:
+        for recorder in (TrajectoryRecorder(capacity = 2), TrajectoryRecorder(capacity = 2, path = path)):
+            lac = _seeded_lac(3)
+            lac.recorder = recorder
+            xs = []
+            for _ in range(5):
+                lac.tune(preds = preds)
+                xs.append(lac.system.x.copy())
+            recorder.close()
+            columns = TrajectoryRecorder.load(path) if recorder.path else recorder.as_dict()
+            assert recorder.size == 5 and np.allclose(columns['x'], xs),\
+                f"❌ Test failed: recorded x {columns['x']} != {xs}"
+            assert columns['blended'].shape == (5, 2, 3) and columns['cost'].shape == (5, 2),\
+                f"❌ Test failed: recorded blended {columns['blended'].shape} / cost {columns['cost'].shape}"
+            assert columns['psi'].shape == (5,) and columns['psi'][-1] == lac.psi and columns['u'].shape == (5, 3),\
+                "❌ Test failed: recorded psi / u columns are wrong"
+        assert isinstance(columns['x'], np.memmap), "❌ Test failed: load did not memory-map the columns"
+        del columns, recorder
+    with tempfile.TemporaryDirectory() as path:
+        for recorder in (TrajectoryRecorder(capacity = 1), TrajectoryRecorder(capacity = 1, path = path)):
+            recorder.record(a = 1.0)
+            recorder.record(a = 2.0, b = np.array([3.0, 4.0]))
+            recorder.record(b = np.array([5.0, 6.0]))
+            recorder.close()
+            columns = TrajectoryRecorder.load(path) if recorder.path else recorder.as_dict()
+            assert np.allclose(columns['a'], [1.0, 2.0, np.nan], equal_nan = True) and\
+                np.allclose(columns['b'], [[np.nan, np.nan], [3.0, 4.0], [5.0, 6.0]], equal_nan = True),\
+                f"❌ Test failed: unrecorded rows are not NaN {columns}"
+            assert not recorder.path or sorted(os.listdir(path)) == ['a.npy', 'b.npy'],\
+                f"❌ Test failed: grow / close left files behind {os.listdir(path)}"
+            del columns, recorder
+    try:
+        LAC(system = lac.system, optimizer = lac.optim, horizon = 2, recorder = [])
+        assert False, "❌ Test failed: recorder = [] was accepted"
+    except TypeError as e:
+        print(f"✅ Test passed: {e}")
+    print("✅ Test passed: TrajectoryRecorder keeps LAC runs in memory and on disk")
+
+def test_lac_array_preds() -> None:
+    rng = np.random.default_rng(0)
+    ticks = rng.normal(0, 0.5, (4, 2, 3))
+    listed, stacked = _seeded_lac(11), _seeded_lac(11)
+    listed.nominal_disturbance = stacked.nominal_disturbance = 'mean_baseline'
+    for preds in ticks:
+        cost_l, u_l = listed.tune(preds = [p for p in preds])
+        cost_a, u_a = stacked.tune(preds = preds)
+        assert isinstance(u_a, np.ndarray) and u_a.shape == (2, 3) and np.shape(cost_a) == (2,),\
+            f"❌ Test failed: tune returned u {np.shape(u_a)} and cost {np.shape(cost_a)}"
+        assert np.allclose(u_l, u_a) and np.allclose(cost_l, cost_a),\
+            "❌ Test failed: list and array predictions gave different plans"
+    assert isinstance(stacked.nominal, np.ndarray) and stacked.nominal.shape == (2, 3),\
+        f"❌ Test failed: nominal is not a (horizon, dim) array {np.shape(stacked.nominal)}"
+    print("✅ Test passed: LAC accepts and returns (horizon, dim) arrays")
+
+def test_lac_dcl() -> None:
+    base = _seeded_lac(5)
+    lac = LAC(system = base.system, optimizer = base.optim, horizon = 2, warmup_steps = 4,
+              seed = 5, recorder = TrajectoryRecorder())
+    preds = np.array([[0.5, 0.0, 0.0], [0.5, 0.0, 0.0]])
+    for _ in range(10):
+        lac.tune(preds = preds)
+    run = lac.recorder.as_dict()
+    errors = np.stack([run['phi'] - preds[0], run['phi'] - run['nominal'][:, 0]], axis = 1)[-4:]
+    assert np.allclose(lac.error_queue.sum, errors.sum(axis = 0)),\
+        "❌ Test failed: error ring does not hold the last warmup_steps errors"
+    eMl, eNo = errors.sum(axis = 0)
+    psi = lac.psi = 0.5
+    v = lac.rho * np.arange(3) * (psi * (eMl - eNo) + eNo)
+    expected = np.clip(psi - 2 * np.dot(eMl - eNo, v) / (np.linalg.norm(v) + 0.03), 0, 1)
+    lac.dcl()
+    assert np.isclose(lac.psi, expected), f"❌ Test failed: dcl psi {lac.psi} != {expected}"
+    print("✅ Test passed: DCL reads the error ring's running sums")
+
+def test_lac_vector_psi() -> None:
+    base = _seeded_lac(9)
+    lac = LAC(system = base.system, optimizer = base.optim, horizon = 2, warmup_steps = 2,
+              seed = 9, vector_psi = True)
+    assert np.shape(lac.psi) == (3,), f"❌ Test failed: vector psi has shape {np.shape(lac.psi)}"
+    preds = np.array([[0.5, 0.3, -0.4], [0.5, 0.3, -0.4]])
+    first = lac.psi.copy()
+    for _ in range(6):
+        lac.tune(preds = preds, base_line = 0.0)
+    assert np.shape(lac.psi) == (3,) and np.all((lac.psi >= 0) & (lac.psi <= 1)),\
+        f"❌ Test failed: vector psi left [0, 1] {lac.psi}"
+    assert np.all(~np.isclose(lac.psi, first)),\
+        f"❌ Test failed: vector psi did not adapt per dimension {first} -> {lac.psi}"
+    try:
+        LAC(system = base.system, optimizer = base.optim, horizon = 2, vector_psi = 1)
+        assert False, "❌ Test failed: vector_psi = 1 was accepted"
+    except TypeError as e:
+        print(f"✅ Test passed: {e}")
+    print("✅ Test passed: LAC adapts one psi per dimension")
+
+def test_lac_profiler() -> None:
+    base = _seeded_lac(11)
+    closed = []
+    profiler = Profiler(callback = lambda name, seconds : closed.append(name))
+    lac = LAC(system = base.system, optimizer = base.optim, horizon = 2, warmup_steps = 2,
+              seed = 11, profiler = profiler)
+    preds = np.array([[0.5, 0.0, 0.0], [0.5, 0.0, 0.0]])
+    for _ in range(4):
+        lac.tune(preds = preds)
+    report = json.loads(profiler.to_json())
+    for phase in ('nominal', 'dcl', 'blend', 'optimize', 'step'):
+        assert phase in report['phases'], f"❌ Test failed: phase {phase} missing from {list(report['phases'])}"
+    assert report['phases']['optimize']['calls'] == 4 and report['phases']['dcl']['calls'] == 2,\
+        f"❌ Test failed: wrong phase call counts {report['phases']}"
+    assert report['counters']['ticks'] == 4 and report['counters']['solves'] == 8,\
+        f"❌ Test failed: wrong counters {report['counters']}"
+    assert report['counters']['cost_evaluations'] == 20 * report['counters']['iterations'],\
+        f"❌ Test failed: cost evaluations do not match the population size {report['counters']}"
+    assert sum(report['stop_reasons'].values()) == 8, f"❌ Test failed: wrong stop reasons {report['stop_reasons']}"
+    assert len(closed) == sum(p['calls'] for p in report['phases'].values()),\
+        f"❌ Test failed: callback saw {len(closed)} phases"
+    silent = _seeded_lac(11)
+    silent.tune(preds = preds)
+    assert silent.profiler.to_dict() == {'phases' : {}, 'counters' : {}, 'stop_reasons' : {}},\
+        f"❌ Test failed: the default profiler recorded {silent.profiler.to_dict()}"
+    print("✅ Test passed: LAC reports per-phase timings and solver counters")
+
+def test_lac_time_budget() -> None:
+    system = LinearSystem(sys_dim = 3, input_dim = 1,
+                          input_space = {'1':{'continuous': [-1.0, 1.0]}},
+                          seed = 5)
+    optimizer = VanillaOptim(system = system, horizon = 2, optimizer_type = 'random', max_iterations = 10 ** 6,
+                             tolerance = 1e-9, tolerance_step = 0, seed = 5)
+    lac = LAC(system = system, optimizer = optimizer, horizon = 2, seed = 5, time_budget_ms = 20)
+    preds = np.array([[0.5, 0.0, 0.0], [0.5, 0.0, 0.0]])
+    for _ in range(3):
+        start = time.perf_counter()
+        cost, u = lac.tune(preds = preds)
+        elapsed = (time.perf_counter() - start) * 1e3
+        assert elapsed < 200, f"❌ Test failed: tune took {elapsed:.1f} ms on a 20 ms budget"
+        assert not lac.converged and u.shape == (2, 3), f"❌ Test failed: tune reported {optimizer.stop_reasons}"
+    try:
+        LAC(system = system, optimizer = optimizer, horizon = 2, time_budget_ms = -1)
+        assert False, "❌ Test failed: time_budget_ms = -1 was accepted"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    print("✅ Test passed: LAC returns within its time budget")
 
 if __name__ == "__main__":
     _test_lac_1()
+    test_lac_fleet()
+    test_lac_seeded()
+    test_lac_recorder()
+    test_lac_array_preds()
+    test_lac_dcl()
+    test_lac_vector_psi()
+    test_lac_profiler()
+    test_lac_time_budget()
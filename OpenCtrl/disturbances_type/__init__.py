@@ -1,6 +1,8 @@
 from .functionals import (baseline_disturbance,
                             meanbasline_disturbance,
                             ema_disturbance)
+from .window import RollingWindow
 __all__ = ["baseline_disturbance",
            "meanbasline_disturbance",
-             "ema_disturbance"]
\ No newline at end of file
+             "ema_disturbance",
+             "RollingWindow"]
\ No newline at end of file
@@ -1,6 +1,8 @@
 import numpy as np
-from typing import List,Optional
+from typing import List,Optional,Union
 from OpenCtrl.SystemDynamicExample.base_sys import BaseSystem
+from OpenCtrl.validation import validation_enabled
+from .window import RollingWindow
 def assert_params(**args):
     def _check_prevs(key : str) -> None:
         if not isinstance(args[key],np.ndarray):
@@ -15,11 +17,11 @@ def assert_params(**args):
         if args['window_size'] <= 0:
             raise TypeError(f"window_size cannot have 0 and negative dimension got window_size : {args['window_size']}")
     if 'window' in args:
-        if not isinstance(args['window'],list):
-            raise TypeError(f"window should be a list but got {type(args['window'])}")
+        if not isinstance(args['window'],(list, RollingWindow)):
+            raise TypeError(f"window should be a list or RollingWindow but got {type(args['window'])}")
         if len(args['window']) != args['window_size']:
             raise ValueError(f"Size of window is not equal to window_size found : {args['window']} != {args['window_size']} ")
-        if not all(isinstance(_, np.ndarray) for _ in args['window']):
+        if isinstance(args['window'], list) and not all(isinstance(_, np.ndarray) for _ in args['window']):
             raise TypeError(f"elements in window should be of type np.ndarray vector: {args['window_size']}")
     if 'prev_ema' in args:
         _check_prevs('prev_ema')        
@@ -42,23 +44,33 @@ def assert_params(**args):
 def baseline_disturbance(horizon : int,
                          window_size : int,
                          base_line : float = 0.1
-                         ) -> List[np.ndarray]:
-    assert_params(**locals())
-    return [np.full(fill_value = base_line,shape=window_size)\
-            for _ in range(horizon)]
+                         ) -> np.ndarray:
+    if validation_enabled():
+        assert_params(**locals())
+    return np.full(fill_value = base_line, shape = (horizon, window_size), dtype = float)
 
 def meanbasline_disturbance(horizon: int,
-                            window : List[np.ndarray],
+                            window : Union[List[np.ndarray], RollingWindow],
                             window_size : int,
-                            ) -> List[np.ndarray]:
-    assert_params(**locals())
-    means = []
+                            ) -> np.ndarray:
+    '''
+    Rolls the window mean forward: each step's mean replaces the newest entry, so with S the sum
+    of the other entries m_{k+1} = (S + m_k) / window_size. Returns the (horizon, dim) means; the
+    newest entry of window is left holding the last one.
+    '''
+    if validation_enabled():
+        assert_params(**locals())
+    if isinstance(window, RollingWindow):
+        rest, mean = window.sum - window.newest, window.newest
+    else:
+        rest, mean = np.sum(window[:-1], axis = 0), window[-1]
+    means = np.empty((horizon,) + np.shape(mean))
     for _ in range(horizon):
-        means_per_dim = []
-        means_per_dim.append(np.mean(window, axis = 0))
-        window.pop()
-        window.extend(np.array(means_per_dim))
-        means.extend(np.array(means_per_dim))
+        mean = means[_] = (rest + mean) / window_size
+    if isinstance(window, RollingWindow):
+        window.replace_newest(mean)
+    else:
+        window[-1] = mean.copy()
     return means
 
 def ema_disturbance(horizon : int,
@@ -66,16 +78,15 @@ def ema_disturbance(horizon : int,
                     prev_real : np.ndarray,
                     window_size : int,
                     alpha : Optional[float] = 0.01
-                    ) -> List[np.ndarray]:
-    assert_params(**locals())
-    def ema(phi:np.ndarray,
-            d : np.ndarray
-            )-> np.ndarray:
-        if not np.size(phi) == np.size(d):
-            raise ValueError(f"dim of prev_ema: {np.size(phi)} not equal to dim of prev_real: {np.size(d)}")
-        return alpha*phi + (1-alpha)*d
-    avgs = []
-    for _ in range(horizon):
-        avgs.append(ema(prev_ema,prev_real))
-        prev_ema = avgs[-1]
-    return avgs
+                    ) -> np.ndarray:
+    '''
+    EMA forecast held at the last real disturbance. e_{k+1} = alpha*e_k + (1-alpha)*d unrolls to
+    e_k = alpha**k * e_0 + (1 - alpha**k) * d, so all steps come out as one (horizon, dim) array.
+    '''
+    if validation_enabled():
+        assert_params(**locals())
+    if not np.size(prev_ema) == np.size(prev_real):
+        raise ValueError(f"dim of prev_ema: {np.size(prev_ema)} not equal to dim of prev_real: {np.size(prev_real)}")
+    prev_real = np.asarray(prev_real, dtype = float)
+    decay = alpha ** np.arange(1, horizon + 1).reshape((horizon,) + (1,) * prev_real.ndim)
+    return decay * prev_ema + (1 - decay) * prev_real
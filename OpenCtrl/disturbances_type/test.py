@@ -3,6 +3,7 @@ from typing import Optional,List
 from .functionals import (baseline_disturbance,
                           meanbasline_disturbance,
                           ema_disturbance)
+from .window import RollingWindow
 from OpenCtrl.SystemDynamicExample.linear_sys import LinearSystem
 def _test_all(  horizon: Optional[int] = 2,
                 disturbance_dim : Optional[int] = 3,
@@ -35,5 +36,57 @@ def _test_all(  horizon: Optional[int] = 2,
     except Exception as e:
         print(f"3.❌ Test Failed ema_disturbance: {e}")
 
+def test_rolling_window() -> None:
+    rng = np.random.default_rng(0)
+    values = [rng.normal(0, 1, 3) for _ in range(5)]
+    reference = [v.copy() for v in values]
+    expected = []
+    for _ in range(4):
+        expected.append(np.mean(reference, axis = 0))
+        reference.pop()
+        reference.append(expected[-1])
+    listed = [v.copy() for v in values]
+    ringed = RollingWindow.from_values(values)
+    for window in (listed, ringed):
+        means = meanbasline_disturbance(4, window, 5)
+        assert np.allclose(means, expected), f"❌ Test failed: rolling mean {means} != {expected}"
+    assert np.allclose(listed, reference) and np.allclose(ringed.to_array(), reference),\
+        "❌ Test failed: newest window entry does not hold the last mean"
+    for _ in range(12):
+        value = rng.normal(0, 1, 3)
+        reference.pop(0)
+        reference.append(value)
+        ringed.push(value)
+    assert np.allclose(ringed.mean(), np.mean(reference, axis = 0)) and np.allclose(ringed.to_array(), reference),\
+        f"❌ Test failed: ring mean {ringed.mean()} != {np.mean(reference, axis = 0)}"
+    try:
+        RollingWindow(0, 3)
+        assert False, "❌ Test failed: window_size = 0 was accepted"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    print("4.✅ Test Passed RollingWindow")
+
+def test_ema_closed_form() -> None:
+    prev_ema, prev_real, alpha = np.array([10.0, 22.0, 32.0]), np.array([4.0, 5.0, 6.0]), 0.3
+    expected = []
+    ema = prev_ema
+    for _ in range(50):
+        ema = alpha * ema + (1 - alpha) * prev_real
+        expected.append(ema)
+    res = ema_disturbance(50, prev_ema, prev_real, 3, alpha = alpha)
+    assert isinstance(res, np.ndarray) and res.shape == (50, 3), f"❌ Test failed: ema shape {np.shape(res)} != (50, 3)"
+    assert np.allclose(res, expected), "❌ Test failed: closed form ema differs from the recursion"
+    assert np.allclose(res[-1], list(res)[-1]), "❌ Test failed: ema rows are not list compatible"
+    fleet = ema_disturbance(4, np.zeros((2, 3)), np.ones((2, 3)), 3, alpha = alpha)
+    assert fleet.shape == (4, 2, 3), f"❌ Test failed: fleet ema shape {fleet.shape} != (4, 2, 3)"
+    try:
+        ema_disturbance(2, np.zeros(2), np.zeros(3), 3)
+        assert False, "❌ Test failed: mismatched prev_ema / prev_real accepted"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    print("5.✅ Test Passed closed form ema_disturbance")
+
 if __name__ == "__main__":
     _test_all()
+    test_rolling_window()
+    test_ema_closed_form()
@@ -0,0 +1,74 @@
+import numpy as np
+from typing import List, Optional, Tuple, Union
+
+def assert_params(**args):
+    if 'window_size' in args:
+        if not isinstance(args['window_size'], int):
+            raise TypeError(f"window_size should be of type int but got {type(args['window_size'])}")
+        if args['window_size'] <= 0:
+            raise ValueError(f"window_size should be within range [1,inf] but got {args['window_size']}")
+    if 'values' in args:
+        if not isinstance(args['values'], (list, np.ndarray)):
+            raise TypeError(f"values should be a list or np.ndarray but got {type(args['values'])}")
+        if len(args['values']) == 0:
+            raise ValueError("values should hold at least one element")
+
+class RollingWindow:
+    '''
+    Fixed-size window of the last window_size disturbances stored as a ring with a running sum,
+    so push, mean and the newest-slot update used by meanbasline_disturbance are O(sys_dim)
+    whatever the window_size. The sum is recomputed once per full turn of the ring to keep
+    rounding error from accumulating.
+    '''
+    def __init__(self,
+                 window_size : int,
+                 shape : Union[int, Tuple[int, ...]],
+                 fill : Optional[float] = 0.0
+                 ) -> None:
+        assert_params(window_size = window_size)
+        self.window_size = window_size
+        self.buffer = np.full((window_size,) + tuple(np.atleast_1d(shape)), float(fill))
+        self.sum = self.buffer.sum(axis = 0)
+        self.head = 0
+
+    @classmethod
+    def from_values(cls,
+                    values : Union[List[np.ndarray], np.ndarray]
+                    ) -> 'RollingWindow':
+        '''Window holding values, ordered oldest first.'''
+        assert_params(values = values)
+        values = np.asarray(values, dtype = float)
+        window = cls(len(values), values.shape[1:])
+        window.buffer[:] = values
+        window.sum = values.sum(axis = 0)
+        return window
+
+    def __len__(self) -> int:
+        return self.window_size
+
+    @property
+    def newest(self) -> np.ndarray:
+        return self.buffer[self.head - 1]
+
+    def mean(self) -> np.ndarray:
+        return self.sum / self.window_size
+
+    def push(self,
+             value : np.ndarray
+             ) -> None:
+        '''Drop the oldest entry and append value.'''
+        self.sum += value - self.buffer[self.head]
+        self.buffer[self.head] = value
+        self.head = (self.head + 1) % self.window_size
+        if self.head == 0:
+            self.sum = self.buffer.sum(axis = 0)
+
+    def replace_newest(self,
+                       value : np.ndarray
+                       ) -> None:
+        self.sum += value - self.newest
+        self.buffer[self.head - 1] = value
+
+    def to_array(self) -> np.ndarray:
+        '''Copy of the window ordered oldest first.'''
+        return np.roll(self.buffer, -self.head, axis = 0)
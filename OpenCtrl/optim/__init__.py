@@ -1,3 +1,5 @@
 from .vanilla_optim import VanillaOptim
-from .optimizer_schema import OptimizerSchema
-__all__ = ["VanillaOptim", "OptimizerSchema"]
\ No newline at end of file
+from .optimizer_schema import OptimizerSchema, vectorized_constraint
+from .stopping import StoppingCriterion, Stall, RelativeImprovement, GradientNorm, WallClock
+__all__ = ["VanillaOptim", "OptimizerSchema", "vectorized_constraint",
+           "StoppingCriterion", "Stall", "RelativeImprovement", "GradientNorm", "WallClock"]
\ No newline at end of file
@@ -1,6 +1,15 @@
 import inspect
+import numpy as np
 from OpenCtrl.SystemDynamicExample.base_sys import BaseSystem
-from typing import Literal, Optional, Dict, Callable, Union
+from OpenCtrl.validation import validation_enabled
+from OpenCtrl.rng import SeedLike, make_rng
+from OpenCtrl.profiling import Profiler, NullProfiler
+from .stopping import StoppingCriterion, StoppingRules, Stall, Deadline
+from typing import Literal, Optional, Dict, Callable, Union, List, Tuple
+
+# gradient_descent variants sharing VanillaOptim.first_order_descent
+FIRST_ORDER_TYPES = ['momentum', 'nesterov', 'adam', 'projected']
+OPTIMIZER_TYPES = ['gradient', 'genetic', 'random', 'analytic'] + FIRST_ORDER_TYPES
 
 def assert_inputs(**args) -> None:
     if 'system' in args:
@@ -19,14 +28,20 @@ def assert_inputs(**args) -> None:
     if 'optimizer_type' in args:
         if not isinstance(args['optimizer_type'], str):
             raise TypeError(f"optimizer_type must be a string but got {type(args['optimizer_type'])}")
-        if args['optimizer_type'] not in ['gradient', 'genetic', 'random']:
-            raise ValueError(f"optimizer_type must be 'gradient', 'genetic', or 'random' but got {args['optimizer_type']}")
-        if args['optimizer_type'] == 'gradient':
+        if args['optimizer_type'] not in OPTIMIZER_TYPES:
+            raise ValueError(f"optimizer_type must be one of {OPTIMIZER_TYPES} but got {args['optimizer_type']}")
+        if args['optimizer_type'] in ['gradient', 'analytic'] + FIRST_ORDER_TYPES:
             if 'alpha' in args:
                 if not isinstance(args['alpha'], (int, float)):
                     raise TypeError(f"alpha must be a number but got {type(args['alpha'])}")
                 if args['alpha'] <= 0:
                     raise ValueError(f"alpha must be a positive number but got {args['alpha']}")
+            for key in ('momentum', 'beta2'):
+                if key in args:
+                    if not isinstance(args[key], (int, float)):
+                        raise TypeError(f"{key} must be a number but got {type(args[key])}")
+                    if not (0 <= args[key] < 1):
+                        raise ValueError(f"{key} must be within [0, 1) but got {args[key]}")
         elif args['optimizer_type'] == 'genetic':
             if 'population_size' in args:
                 if not isinstance(args['population_size'], int):
@@ -68,6 +83,57 @@ def assert_inputs(**args) -> None:
             raise TypeError(f"tolerance must be a number but got {type(args['tolerance'])}")
         if args['tolerance'] <= 0:
             raise ValueError(f"tolerance must be a positive number but got {args['tolerance']}")
+    if 'batch_size' in args:
+        if not isinstance(args['batch_size'], int):
+            raise TypeError(f"batch_size must be an integer but got {type(args['batch_size'])}")
+        if args['batch_size'] <= 0:
+            raise ValueError(f"batch_size must be a positive integer but got {args['batch_size']}")
+    if 'vectorized' in args:
+        if not isinstance(args['vectorized'], bool):
+            raise TypeError(f"vectorized must be a boolean but got {type(args['vectorized'])}")
+    if 'joint_horizon' in args:
+        if not isinstance(args['joint_horizon'], bool):
+            raise TypeError(f"joint_horizon must be a boolean but got {type(args['joint_horizon'])}")
+        if args['joint_horizon'] and args.get('optimizer_type') not in ['gradient'] + FIRST_ORDER_TYPES:
+            raise ValueError(f"joint_horizon is only supported with optimizer_type in {['gradient'] + FIRST_ORDER_TYPES} but got {args.get('optimizer_type')}")
+    if 'restarts' in args:
+        if not isinstance(args['restarts'], int):
+            raise TypeError(f"restarts must be an integer but got {type(args['restarts'])}")
+        if args['restarts'] <= 0:
+            raise ValueError(f"restarts must be a positive integer but got {args['restarts']}")
+        if args['restarts'] > 1:
+            if args.get('optimizer_type') not in ['gradient'] + FIRST_ORDER_TYPES:
+                raise ValueError(f"restarts is only supported with optimizer_type in {['gradient'] + FIRST_ORDER_TYPES} but got {args.get('optimizer_type')}")
+            if args.get('joint_horizon') or getattr(args.get('system'), 'n_systems', None) is not None:
+                raise ValueError("restarts is not supported with joint_horizon or a LinearSystemBatch")
+    if 'warm_start' in args:
+        if not isinstance(args['warm_start'], bool):
+            raise TypeError(f"warm_start must be a boolean but got {type(args['warm_start'])}")
+    if 'validate' in args and args['validate'] is not None:
+        if not isinstance(args['validate'], bool):
+            raise TypeError(f"validate must be a boolean or None but got {type(args['validate'])}")
+    if 'plot_every' in args:
+        if not isinstance(args['plot_every'], int):
+            raise TypeError(f"plot_every must be an integer but got {type(args['plot_every'])}")
+        if args['plot_every'] <= 0:
+            raise ValueError(f"plot_every must be a positive integer but got {args['plot_every']}")
+    if 'seed' in args and args['seed'] is not None:
+        if not isinstance(args['seed'], (int, np.random.SeedSequence, np.random.Generator)):
+            raise TypeError(f"seed must be an integer, np.random.SeedSequence, np.random.Generator or None but got {type(args['seed'])}")
+    if 'profiler' in args and args['profiler'] is not None:
+        if not isinstance(args['profiler'], Profiler):
+            raise TypeError(f"profiler must be an instance of Profiler or None but got {type(args['profiler'])}")
+    if 'time_budget_ms' in args and args['time_budget_ms'] is not None:
+        if isinstance(args['time_budget_ms'], bool) or not isinstance(args['time_budget_ms'], (int, float)):
+            raise TypeError(f"time_budget_ms must be a number or None but got {type(args['time_budget_ms'])}")
+        if args['time_budget_ms'] <= 0:
+            raise ValueError(f"time_budget_ms must be a positive number but got {args['time_budget_ms']}")
+    if 'stopping' in args and args['stopping'] is not None:
+        if not isinstance(args['stopping'], (list, tuple)):
+            raise TypeError(f"stopping must be a list of StoppingCriterion or None but got {type(args['stopping'])}")
+        for criterion in args['stopping']:
+            if not isinstance(criterion, StoppingCriterion):
+                raise TypeError(f"stopping elements must be instances of StoppingCriterion but got {type(criterion)}")
     if 'constraints' in args and args['constraints'] is not None:
         if not isinstance(args['constraints'], Dict):
             raise TypeError(f"constraints must be a dictionary or none but got {type(args['constraints'])}")
@@ -77,12 +143,21 @@ def assert_inputs(**args) -> None:
             if not isinstance(value, Callable):
                 raise TypeError(f"constraint values must be an object but got {type(value)}")
 
+def vectorized_constraint(constraint : Callable) -> Callable:
+    '''
+    Marks a constraint as vectorized: it is called once with the whole population, u and x of
+    shape (n, sys_dim), and must return the (n, sys_dim) correction subtracted from u.
+    '''
+    constraint.vectorized = True
+    return constraint
+
 class OptimizerSchema:
     def __init__(self,
                 system: BaseSystem,
                 horizon : int,
                 cost_function : Literal['quadratic', 'linear'] = 'quadratic',
-                optimizer_type : Literal['gradient', 'genetic', 'random'] = 'gradient',
+                optimizer_type : Literal['gradient', 'genetic', 'random', 'analytic',
+                                         'momentum', 'nesterov', 'adam', 'projected'] = 'gradient',
                 alpha : float = 0.01,
                 population_size : int = 100,
                 cross_over_rate : float = 0.7,
@@ -92,7 +167,20 @@ class OptimizerSchema:
                 tolerance_step : int = 50,
                 threshold : float = 0.005,
                 tolerance : float = 1e-3,
-                constraints : Optional[Dict[str, Callable]] = None
+                constraints : Optional[Dict[str, Callable]] = None,
+                vectorized : bool = False,
+                batch_size : int = 64,
+                joint_horizon : bool = False,
+                warm_start : bool = False,
+                validate : Optional[bool] = None,
+                plot_every : int = 50,
+                seed : SeedLike = None,
+                profiler : Optional[Profiler] = None,
+                stopping : Optional[List[StoppingCriterion]] = None,
+                time_budget_ms : Optional[float] = None,
+                momentum : float = 0.9,
+                beta2 : float = 0.999,
+                restarts : int = 1
                 ) -> None:
         args = locals()
         assert_inputs(**args)
@@ -105,27 +193,61 @@ class OptimizerSchema:
         self.constraints = constraints 
         self.tolerance_step = tolerance_step
         self.threshold = threshold
-        if optimizer_type == 'gradient':
+        self.vectorized = vectorized
+        self.batch_size = batch_size
+        self.joint_horizon = joint_horizon
+        self.warm_start = warm_start
+        self._validate = validate
+        self.plot_every = plot_every
+        self.rng = make_rng(seed)
+        self.profiler = NullProfiler() if profiler is None else profiler
+        self.time_budget_ms = time_budget_ms
+        self.restarts = restarts
+        self.deadline = Deadline()
+        self.stopping = StoppingRules((self._default_stopping() if stopping is None else list(stopping)) + [self.deadline])
+        if optimizer_type in ['gradient', 'analytic'] + FIRST_ORDER_TYPES:
             self.alpha = alpha
+        if optimizer_type in FIRST_ORDER_TYPES:
+            self.momentum = momentum
+            self.beta2 = beta2
         if optimizer_type == 'genetic':
             self.population_size = population_size
             self.cross_over_rate = cross_over_rate
             self.mutation_rate = mutation_rate
             self.cut_off_rate = cut_off_rate
-        if constraints is not None:
-            for k,v in constraints.items():
-              sig = inspect.signature(v)
-              if len(sig.parameters) != 1:
-                raise ValueError(f"Constraint function {k} must take exactly one argument but got {len(sig.parameters)}")
-              self.get_attr(sig.parameters)  
+        self._constraint_table = self._compile_constraints(constraints) if constraints is not None else []
 
-    def _get_attr(self, 
-                  params : dict,
-                  ) -> None:
-        for param in params.values():
-            if param.name not in self.system.locals() or param.name != 'u':
-                raise ValueError(f"Constraint function parameter {param.name} is not a valid attribute of the system or u is not defined in the constraint function")        
-    
+    def _compile_constraints(self,
+                             constraints : Dict[str, Callable]
+                             ) -> List[Tuple[Callable, Tuple[str, ...], bool]]:
+        '''
+        Inspect every constraint once and record, in call order, which of u / x it takes and
+        whether it follows the vectorized protocol (see vectorized_constraint).
+        '''
+        table = []
+        for k, v in constraints.items():
+            params = tuple(inspect.signature(v).parameters)
+            if not 0 < len(params) <= 2 or any(param not in ('u', 'x') for param in params):
+                raise ValueError(f"Constraint function {k} must take the arguments u and/or x but got {params}")
+            table.append((v, params, getattr(v, 'vectorized', False)))
+        return table
+
+    def _default_stopping(self) -> List[StoppingCriterion]:
+        '''The historical plateau rule: tolerance_step iterations in a row improving by less than threshold.'''
+        if self.tolerance_step == 0 or self.tolerance_step > self.max_iterations * 0.90:
+            return []
+        return [Stall(self.threshold, self.tolerance_step)]
+
+    def reseed(self,
+               seed : SeedLike
+               ) -> None:
+        '''Swap in a new random stream, e.g. a child from OpenCtrl.rng.spawn_rngs in a worker.'''
+        self.rng = make_rng(seed)
+
+    @property
+    def validate(self) -> bool:
+        '''Whether hot-path argument checks run; None at construction follows OpenCtrl.validation.'''
+        return validation_enabled() if self._validate is None else self._validate
 
     def optimize(self) -> None:
         raise NotImplementedError("The optimize method must be implemented in the subclass.")
@@ -143,4 +265,7 @@ class OptimizerSchema:
         raise NotImplementedError("The gradient_descent method must be implemented in the subclass.")
     
     def genetic_algorithm(self) -> None:
-        raise NotImplementedError("The genetic_algorithm method must be implemented in the subclass.")
\ No newline at end of file
+        raise NotImplementedError("The genetic_algorithm method must be implemented in the subclass.")
+
+    def analytic_solution(self) -> None:
+        raise NotImplementedError("The analytic_solution method must be implemented in the subclass.")
\ No newline at end of file
@@ -0,0 +1,176 @@
+import time
+import numpy as np
+from typing import List, Optional
+
+# stop reasons that mean the solver ran out of iterations or time rather than settling
+UNCONVERGED_REASONS = ('max_iterations', 'time_budget')
+
+def assert_params(**args):
+    for key in ('threshold', 'rtol', 'gtol', 'budget_ms'):
+        if key in args:
+            if not isinstance(args[key], (int, float)) or isinstance(args[key], bool):
+                raise TypeError(f"{key} must be a number but got {type(args[key])}")
+            if args[key] < 0:
+                raise ValueError(f"{key} must be a non-negative number but got {args[key]}")
+    if 'patience' in args:
+        if not isinstance(args['patience'], int):
+            raise TypeError(f"patience must be an integer but got {type(args['patience'])}")
+        if args['patience'] <= 0:
+            raise ValueError(f"patience must be a positive integer but got {args['patience']}")
+    if 'criteria' in args:
+        if not isinstance(args['criteria'], (list, tuple)):
+            raise TypeError(f"criteria must be a list of StoppingCriterion but got {type(args['criteria'])}")
+        for criterion in args['criteria']:
+            if not isinstance(criterion, StoppingCriterion):
+                raise TypeError(f"criteria elements must be instances of StoppingCriterion but got {type(criterion)}")
+
+class StoppingCriterion:
+    '''
+    One early-stop rule. reset() is called at the start of every solve, then the criterion is
+    called once per iteration with the iteration's cost (and gradient, for gradient solvers)
+    and returns its reason string to stop, or None to keep going.
+    '''
+    reason = 'stopped'
+
+    def reset(self) -> None:
+        pass
+
+    def __call__(self,
+                 cost : float,
+                 grad : Optional[np.ndarray] = None
+                 ) -> Optional[str]:
+        raise NotImplementedError("StoppingCriterion subclasses must implement __call__.")
+
+class Stall(StoppingCriterion):
+    '''Stop once cost has dropped by less than threshold for patience consecutive iterations.'''
+    reason = 'plateau'
+
+    def __init__(self,
+                 threshold : float = 0.005,
+                 patience : int = 50
+                 ) -> None:
+        assert_params(threshold = threshold, patience = patience)
+        self.threshold = threshold
+        self.patience = patience
+        self.reset()
+
+    def reset(self) -> None:
+        self.prev_cost = float('inf')
+        self.count = 0
+
+    def __call__(self,
+                 cost : float,
+                 grad : Optional[np.ndarray] = None
+                 ) -> Optional[str]:
+        self.count = self.count + 1 if self.prev_cost - cost < self.threshold else 0
+        self.prev_cost = cost
+        return self.reason if self.count >= self.patience else None
+
+class RelativeImprovement(StoppingCriterion):
+    '''Stop once the best cost has not improved by a fraction rtol of itself for patience iterations.'''
+    reason = 'relative_improvement'
+
+    def __init__(self,
+                 rtol : float = 1e-4,
+                 patience : int = 10
+                 ) -> None:
+        assert_params(rtol = rtol, patience = patience)
+        self.rtol = rtol
+        self.patience = patience
+        self.reset()
+
+    def reset(self) -> None:
+        self.best = float('inf')
+        self.count = 0
+
+    def __call__(self,
+                 cost : float,
+                 grad : Optional[np.ndarray] = None
+                 ) -> Optional[str]:
+        if self.best == float('inf') or cost < self.best - self.rtol * abs(self.best):
+            self.best = cost
+            self.count = 0
+        else:
+            self.count += 1
+        return self.reason if self.count >= self.patience else None
+
+class GradientNorm(StoppingCriterion):
+    '''Stop once the L2 norm of the (masked) gradient is at most gtol. Ignored by gradient-free solvers.'''
+    reason = 'gradient_norm'
+
+    def __init__(self,
+                 gtol : float = 1e-6
+                 ) -> None:
+        assert_params(gtol = gtol)
+        self.gtol = gtol
+
+    def __call__(self,
+                 cost : float,
+                 grad : Optional[np.ndarray] = None
+                 ) -> Optional[str]:
+        if grad is None:
+            return None
+        return self.reason if np.linalg.norm(grad) <= self.gtol else None
+
+class WallClock(StoppingCriterion):
+    '''Stop once budget_ms milliseconds have passed since the solve started.'''
+    reason = 'time_budget'
+
+    def __init__(self,
+                 budget_ms : float
+                 ) -> None:
+        assert_params(budget_ms = budget_ms)
+        self.budget_ms = budget_ms
+        self.reset()
+
+    def reset(self) -> None:
+        self.deadline = time.perf_counter() + self.budget_ms / 1e3
+
+    def __call__(self,
+                 cost : float,
+                 grad : Optional[np.ndarray] = None
+                 ) -> Optional[str]:
+        return self.reason if time.perf_counter() >= self.deadline else None
+
+class Deadline(StoppingCriterion):
+    '''
+    Stop once time.perf_counter() reaches at. Unlike WallClock it is not re-armed per solve:
+    VanillaOptim.optimize sets at once per call, so the budget spans every horizon step.
+    '''
+    reason = 'time_budget'
+
+    def __init__(self,
+                 at : Optional[float] = None
+                 ) -> None:
+        self.at = at
+
+    def expired(self) -> bool:
+        return self.at is not None and time.perf_counter() >= self.at
+
+    def __call__(self,
+                 cost : float,
+                 grad : Optional[np.ndarray] = None
+                 ) -> Optional[str]:
+        return self.reason if self.expired() else None
+
+class StoppingRules:
+    '''The criteria of one optimizer, checked in order; the first to fire ends the solve.'''
+    def __init__(self,
+                 criteria : List[StoppingCriterion]
+                 ) -> None:
+        assert_params(criteria = criteria)
+        self.criteria = list(criteria)
+
+    def reset(self) -> None:
+        for criterion in self.criteria:
+            criterion.reset()
+
+    def __call__(self,
+                 cost : float,
+                 grad : Optional[np.ndarray] = None
+                 ) -> Optional[str]:
+        for criterion in self.criteria:
+            reason = criterion(cost, grad)
+            if reason is not None:
+                return reason
+        return None
@@ -1,6 +1,10 @@
+import time
 import numpy as np
+from OpenCtrl.validation import set_validation, validation_enabled
 from .vanilla_optim import VanillaOptim
-from .optimizer_schema import OptimizerSchema
+from .optimizer_schema import OptimizerSchema, vectorized_constraint
+from .stopping import Stall, RelativeImprovement, GradientNorm
+from OpenCtrl.profiling import Profiler
 from OpenCtrl.SystemDynamicExample.linear_sys import LinearSystem
 
 def test_optimizer_schema():
@@ -84,7 +88,379 @@ def test_vanilla_optim():
     print(f"Costs: {C}, Controls: {U}")
   
   
+def test_vanilla_optim_vectorized():
+    np.random.seed(0)
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 2,
+                          input_space = {'1':{'continuous': [-255, 255]}, '2':{'discrete': [-10, 10, 2]}},
+                          sys_name = "TestSystem")
+    optimizer = VanillaOptim(system = system,
+                             horizon = 1,
+                             optimizer_type = 'genetic',
+                             population_size = 50,
+                             max_iterations = 100,
+                             tolerance = 1e-3,
+                             vectorized = True)
+    population = optimizer._get_random_population(1000)
+    assert population.shape == (1000, 3),\
+        f"❌ Test failed: population shape {population.shape} != (1000, 3)"
+    assert np.all(population[:, 2] == 0) and np.all(np.isin(population[:, 1], np.arange(-10, 10, 2))),\
+        "❌ Test failed: sampled population does not respect the input space"
+    x = np.array([12.0, -4.0, 7.0])
+    cost, u = optimizer.genetic_algorithm(x)
+    assert u.shape == (3,) and u[2] == 0,\
+        f"❌ Test failed: genetic_algorithm returned u = {u}"
+    assert np.isclose(cost, optimizer.cost(x, u)),\
+        f"❌ Test failed: batched cost {cost} != cost {optimizer.cost(x, u)}"
+    assert cost < 5.0,\
+        f"❌ Test failed: vectorized genetic_algorithm did not converge, cost = {cost}"
+    print("5. ✅ VanillaOptim vectorized genetic_algorithm test passed")
+    optimizer = VanillaOptim(system = system,
+                             horizon = 1,
+                             optimizer_type = 'random',
+                             max_iterations = 50,
+                             tolerance = 1e-3,
+                             vectorized = True,
+                             batch_size = 128)
+    cost, u = optimizer.random_search(x)
+    assert np.isclose(cost, optimizer.cost(x, u)) and u[2] == 0,\
+        f"❌ Test failed: vectorized random_search returned cost {cost} for u = {u}"
+    print("6. ✅ VanillaOptim vectorized random_search test passed")
+def test_vanilla_optim_analytic():
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 2,
+                          input_space = {'1':{'continuous': [-5, 5]}, '2':{'random': [-255, 255]}},
+                          sys_name = "TestSystem")
+    optimizer = VanillaOptim(system = system,
+                             horizon = 1,
+                             optimizer_type = 'analytic')
+    x = np.array([12.0, -4.0, 7.0])
+    cost, u = optimizer.analytic_solution(x)
+    assert np.allclose(u, [-5.0, 4.0, 0.0]),\
+        f"❌ Test failed: analytic_solution returned u = {u} != [-5, 4, 0]"
+    assert np.isclose(cost, 7.0),\
+        f"❌ Test failed: analytic_solution returned cost = {cost} != 7.0"
+    samples = optimizer._get_random_population(1000)
+    assert np.all(optimizer._batch_cost(x, samples) >= cost),\
+        "❌ Test failed: a sampled input beat the analytic solution"
+    print("7. ✅ VanillaOptim analytic_solution test passed")
+
+def test_vanilla_optim_joint_horizon():
+    np.random.seed(0)
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 2,
+                          input_space = {'1':{'continuous': [-255, 255]}, '2':{'continuous': [-20, 20]}},
+                          sys_name = "TestSystem")
+    optimizer = VanillaOptim(system = system,
+                             horizon = 5,
+                             optimizer_type = 'gradient',
+                             alpha = 0.1,
+                             max_iterations = 2000,
+                             joint_horizon = True)
+    preds = [np.array([1.0, 2.0, 3.0]) * k for k in range(1, 6)]
+    C, U = optimizer.optimize(preds)
+    assert len(C) == 5 and len(U) == 5,\
+        f"❌ Test failed: joint optimize returned {len(C)} costs and {len(U)} inputs for horizon 5"
+    assert all(np.all(np.abs(u[:2]) <= [255, 20]) and u[2] == 0 for u in U),\
+        f"❌ Test failed: joint optimize returned inputs outside the input space {U}"
+    rollout = system.mpc_rollout(np.array(U), np.array(preds))
+    assert np.allclose(C, np.linalg.norm(rollout * optimizer.input_space_mask, axis = 1)),\
+        "❌ Test failed: joint costs do not match the rollout of the returned inputs"
+    assert sum(C) < 1.0,\
+        f"❌ Test failed: joint optimize did not converge, total cost = {sum(C)}"
+    print("8. ✅ VanillaOptim joint_horizon test passed")
+
+def test_vanilla_optim_warm_start():
+    np.random.seed(0)
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 2,
+                          input_space = {'1':{'continuous': [-255, 255]}, '2':{'continuous': [-255, 255]}},
+                          sys_name = "TestSystem")
+    optimizer = VanillaOptim(system = system,
+                             horizon = 3,
+                             optimizer_type = 'genetic',
+                             population_size = 20,
+                             max_iterations = 20,
+                             vectorized = True,
+                             warm_start = True)
+    preds = [np.array([1.0, 2.0, 3.0]) for _ in range(3)]
+    C, U = optimizer.optimize(preds)
+    assert optimizer.warm_U.shape == (3, 3),\
+        f"❌ Test failed: warm start buffer has shape {optimizer.warm_U.shape} != (3, 3)"
+    assert np.allclose(optimizer.warm_U[:2], U[1:]) and np.allclose(optimizer.warm_U[2], U[2]),\
+        "❌ Test failed: warm start buffer is not the previous plan shifted by one step"
+    optimizer.max_iterations = 1
+    x = optimizer.project(system.x, preds[0])
+    cost, _ = optimizer.genetic_algorithm(x, horizon = 0)
+    assert cost <= optimizer.cost(x, optimizer.warm_U[0]) + 1e-9,\
+        "❌ Test failed: warm start was not seeded into the initial population"
+    optimizer.reset_warm_start()
+    assert optimizer.warm_U is None, "❌ Test failed: reset_warm_start did not clear the buffer"
+    print("9. ✅ VanillaOptim warm_start test passed")
+
+def _cap_u(u):
+    return np.maximum(u - 1.0, 0.0)
+
+@vectorized_constraint
+def _cap_u_vectorized(u):
+    return np.maximum(u - 1.0, 0.0)
+
+def _follow_x(u, x):
+    return 0.1 * (u + x)
+
+def test_vanilla_optim_constraints():
+    np.random.seed(0)
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 2,
+                          input_space = {'1':{'continuous': [-5, 5]}, '2':{'continuous': [-5, 5]}},
+                          sys_name = "TestSystem")
+    settings = dict(system = system, horizon = 1, optimizer_type = 'genetic',
+                    population_size = 20, max_iterations = 10, vectorized = True)
+    scalar = VanillaOptim(constraints = {'cap' : _cap_u, 'follow' : _follow_x}, **settings)
+    vectorized = VanillaOptim(constraints = {'cap' : _cap_u_vectorized, 'follow' : _follow_x}, **settings)
+    assert [params for _, params, _ in scalar._constraint_table] == [('u',), ('u', 'x')],\
+        f"❌ Test failed: constraint table {scalar._constraint_table}"
+    U = scalar._get_random_population(50)
+    x = np.array([1.0, -2.0, 0.5])
+    constrained = scalar._constrain(U, x)
+    assert np.allclose(constrained, vectorized._constrain(U, x)),\
+        "❌ Test failed: vectorized and per-row constraints disagree"
+    assert np.allclose(constrained[7], scalar._validate_constraints(U[7].copy(), x)),\
+        "❌ Test failed: _constrain disagrees with _validate_constraints"
+    cost, u = vectorized.genetic_algorithm(x)
+    assert np.isfinite(cost) and u.shape == (3,),\
+        f"❌ Test failed: constrained genetic_algorithm returned cost {cost}, u {u}"
+    try:
+        VanillaOptim(constraints = {'bad' : lambda v : v}, **settings)
+        assert False, "❌ Test failed: constraint with an unknown argument was accepted"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    print("10. ✅ VanillaOptim compiled constraints test passed")
+
+def test_vanilla_optim_validation():
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 1,
+                          input_space = {'1':{'continuous': [-5, 5]}},
+                          sys_name = "TestSystem")
+    optimizer = VanillaOptim(system = system, horizon = 1)
+    optimizer.input_space_mask = np.array([1.0, 0.0, 0.0])
+    try:
+        optimizer.quadratic_cost([1.0, 2.0, 3.0], np.zeros(3))
+        assert False, "❌ Test failed: quadratic_cost accepted a list with validation on"
+    except TypeError as e:
+        print(f"✅ Test passed: {e}")
+    previous = validation_enabled()
+    try:
+        set_validation(False)
+        assert optimizer.quadratic_cost(np.array([1.0, 2.0, 3.0]), np.zeros(3)) == 1.0,\
+            "❌ Test failed: quadratic_cost changed result in production mode"
+        strict = VanillaOptim(system = system, horizon = 1, validate = True)
+        assert strict.validate and not optimizer.validate,\
+            "❌ Test failed: per-instance validate did not override the global switch"
+    finally:
+        set_validation(previous)
+    print("11. ✅ VanillaOptim validation toggle test passed")
+
+def test_vanilla_optim_plot():
+    np.random.seed(0)
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 1,
+                          input_space = {'1':{'continuous': [-5, 5]}},
+                          sys_name = "TestSystem")
+    optimizer = VanillaOptim(system = system,
+                             horizon = 2,
+                             max_iterations = 30,
+                             tolerance = 1e-6,
+                             tolerance_step = 0,
+                             plot_every = 10)
+    optimizer.optimize(preds = [np.array([1.0, 2.0, 3.0]), np.array([0.5, 1.5, 2.5])], verbose = True)
+    history = optimizer.cost_plot.history
+    assert 0 < len(history) <= 60, f"❌ Test failed: expected at most 60 recorded costs but got {len(history)}"
+    assert len(optimizer.cost_plot.costs) == 60, "❌ Test failed: cost buffer was not preallocated for the full solve"
+    assert optimizer.cost_plot.horizon == 1, "❌ Test failed: plot title does not track the horizon step"
+    import matplotlib.pyplot as plt
+    figures = len(plt.get_fignums())
+    for _ in range(3):
+        optimizer.optimize(preds = [np.array([1.0, 2.0, 3.0]), np.array([0.5, 1.5, 2.5])], verbose = True)
+    assert len(plt.get_fignums()) == figures and 0 < len(optimizer.cost_plot.history) <= 60,\
+        f"❌ Test failed: repeated verbose solves opened {len(plt.get_fignums()) - figures} new figures"
+    plt.close(optimizer.cost_plot._figure)
+    try:
+        VanillaOptim(system = system, horizon = 1, plot_every = 0)
+        assert False, "❌ Test failed: plot_every = 0 was accepted"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    print("12. ✅ VanillaOptim decimated plot test passed")
+
+def test_vanilla_optim_stopping():
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 1,
+                          input_space = {'1':{'continuous': [-1, 1]}},
+                          sys_name = "TestSystem")
+    preds = np.array([[5.0, 4.0, 3.0], [5.0, 4.0, 3.0]])
+    profiler = Profiler()
+    optimizer = VanillaOptim(system = system, horizon = 2, max_iterations = 1000, tolerance_step = 20,
+                             seed = 0, profiler = profiler)
+    assert isinstance(optimizer.stopping.criteria[0], Stall),\
+        f"❌ Test failed: default stopping rules are {optimizer.stopping.criteria}"
+    optimizer.optimize(preds)
+    optimizer.optimize(preds)
+    assert profiler.stop_reasons == {'plateau' : 4}, f"❌ Test failed: gradient descent stop reasons {profiler.stop_reasons}"
+    assert profiler.counters['iterations'] < 0.25 * 4 * 1000,\
+        f"❌ Test failed: gradient descent ran {profiler.counters['iterations']} iterations over 4 solves"
+    for optimizer_type, criterion, reason in (('gradient', GradientNorm(gtol = 1e3), 'gradient_norm'),
+                                              ('random', RelativeImprovement(rtol = 0.5, patience = 3), 'relative_improvement'),
+                                              ('genetic', RelativeImprovement(rtol = 0.5, patience = 3), 'relative_improvement')):
+        profiler = Profiler()
+        optimizer = VanillaOptim(system = system, horizon = 2, optimizer_type = optimizer_type, population_size = 10,
+                                 tolerance = 1e-9, seed = 0, profiler = profiler, stopping = [criterion])
+        C, U = optimizer.optimize(preds)
+        assert profiler.stop_reasons == {reason : 2} and np.all(np.isfinite(C)),\
+            f"❌ Test failed: {optimizer_type} stopped with {profiler.stop_reasons}"
+    try:
+        VanillaOptim(system = system, horizon = 1, stopping = [lambda cost, grad : None])
+        assert False, "❌ Test failed: a plain callable was accepted as a stopping criterion"
+    except TypeError as e:
+        print(f"✅ Test passed: {e}")
+    print("13. ✅ VanillaOptim stopping criteria test passed")
+
+def test_vanilla_optim_time_budget():
+    system = LinearSystem(sys_dim = 3,
+                          input_dim = 1,
+                          input_space = {'1':{'continuous': [-1, 1]}},
+                          sys_name = "TestSystem")
+    preds = np.array([[5.0, 4.0, 3.0], [5.0, 4.0, 3.0], [5.0, 4.0, 3.0]])
+    for optimizer_type in ('gradient', 'random', 'genetic'):
+        optimizer = VanillaOptim(system = system, horizon = 3, optimizer_type = optimizer_type, population_size = 20,
+                                 max_iterations = 10 ** 6, tolerance = 1e-9, tolerance_step = 0, seed = 0,
+                                 time_budget_ms = 30)
+        start = time.perf_counter()
+        C, U = optimizer.optimize(preds)
+        elapsed = (time.perf_counter() - start) * 1e3
+        assert elapsed < 300, f"❌ Test failed: {optimizer_type} took {elapsed:.1f} ms on a 30 ms budget"
+        assert not optimizer.converged and 'time_budget' in optimizer.stop_reasons,\
+            f"❌ Test failed: {optimizer_type} stop reasons {optimizer.stop_reasons}"
+        assert U.shape == (3, 3) and np.all(np.isfinite(C)), f"❌ Test failed: {optimizer_type} returned no best-so-far plan"
+    # a solve the deadline ran out before must not run a generation of its own
+    wide = LinearSystem(sys_dim = 32, input_dim = 32, input_space = {str(i + 1) : {'continuous': [-1.0, 1.0]} for i in range(32)},
+                        sys_name = "TestSystem", seed = 0)
+    optimizer = VanillaOptim(system = wide, horizon = 10, optimizer_type = 'genetic', population_size = 200,
+                             max_iterations = 10 ** 6, tolerance = 1e-9, tolerance_step = 0, seed = 0, time_budget_ms = 20)
+    wide_preds = np.random.default_rng(0).normal(0, 1, (10, 32))
+    for _ in range(2):
+        start = time.perf_counter()
+        C, U = optimizer.optimize(wide_preds)
+        elapsed = (time.perf_counter() - start) * 1e3
+        assert elapsed < 100, f"❌ Test failed: a 200 x 32 genetic solve over 10 steps took {elapsed:.1f} ms on a 20 ms budget"
+        assert U.shape == (10, 32) and np.all(np.abs(U) <= 1.0) and np.all(np.isfinite(C)),\
+            "❌ Test failed: timed out steps returned no usable input"
+    for joint_horizon in (False, True):
+        optimizer = VanillaOptim(system = system, horizon = 3, joint_horizon = joint_horizon, seed = 0)
+        C, U = optimizer.optimize(preds, deadline = time.perf_counter())
+        assert optimizer.stop_reasons == ['time_budget'] * 3 and np.allclose(U[0], np.clip(-(system.x + preds[0]), -1, 1) * [1, 0, 0]),\
+            f"❌ Test failed: expired deadline (joint_horizon = {joint_horizon}) gave {optimizer.stop_reasons} and U[0] = {U[0]}"
+    optimizer = VanillaOptim(system = system, horizon = 3, optimizer_type = 'analytic', time_budget_ms = 30)
+    optimizer.optimize(preds)
+    assert optimizer.converged, f"❌ Test failed: analytic solve reported {optimizer.stop_reasons}"
+    try:
+        VanillaOptim(system = system, horizon = 1, time_budget_ms = 0)
+        assert False, "❌ Test failed: time_budget_ms = 0 was accepted"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    # early and deadline stops hand back the best iterate, which must be the input that was scored
+    system = LinearSystem(sys_dim = 2, input_dim = 1, input_space = {'1':{'continuous': [-1.0, 1.0]}},
+                          sys_name = "TestSystem", seed = 0)
+    for kwargs in ({}, {'max_iterations' : 10 ** 6, 'tolerance_step' : 0, 'time_budget_ms' : 20}):
+        optimizer = VanillaOptim(system = system, horizon = 1, seed = 0, **kwargs)
+        C, U = optimizer.optimize(np.array([[5.0, 0.0]]))
+        assert np.all(np.abs(U) <= 1.0), f"❌ Test failed: best-so-far input {U} left the bounds"
+        assert np.isclose(C[0], optimizer.cost(system.x + np.array([5.0, 0.0]), U[0])),\
+            f"❌ Test failed: cost {C[0]} does not belong to the returned input {U[0]}"
+    print("14. ✅ VanillaOptim time budget test passed")
+
+def test_vanilla_optim_first_order():
+    # five inputs spanning four orders of magnitude
+    input_space = {str(i + 1) : {'continuous': [-10.0 ** (i - 2), 10.0 ** (i - 2)]} for i in range(5)}
+    preds = np.tile(np.array([0.005, 0.05, 0.5, 5.0, 50.0]), (3, 1))
+    def _solve(optimizer_type, **kwargs):
+        system = LinearSystem(sys_dim = 5, input_dim = 5, input_space = input_space, sys_name = "TestSystem", seed = 0)
+        profiler = Profiler()
+        optimizer = VanillaOptim(system = system, horizon = 3, optimizer_type = optimizer_type, max_iterations = 500,
+                                 seed = 0, profiler = profiler, **kwargs)
+        C, U = optimizer.optimize(preds)
+        assert np.all(np.abs(U) <= 10.0 ** (np.arange(5) - 2)), f"❌ Test failed: {optimizer_type} left the input bounds"
+        return C.sum(), profiler.stop_reasons
+    baseline, _ = _solve('gradient', alpha = 0.05)
+    for optimizer_type, alpha in (('momentum', 0.05), ('nesterov', 0.05), ('adam', 1.0), ('projected', 0.05)):
+        cost, stop_reasons = _solve(optimizer_type, alpha = alpha)
+        # adam's fixed per-dimension step length hovers near the optimum instead of settling
+        assert cost < 0.1 and (optimizer_type == 'adam' or cost <= baseline),\
+            f"❌ Test failed: {optimizer_type} reached {cost} against {baseline}"
+        assert optimizer_type == 'adam' or 'max_iterations' not in stop_reasons,\
+            f"❌ Test failed: {optimizer_type} stopped with {stop_reasons}"
+        cost, _ = _solve(optimizer_type, alpha = alpha, joint_horizon = True)
+        assert np.isfinite(cost) and (optimizer_type == 'adam' or cost < 0.1),\
+            f"❌ Test failed: joint {optimizer_type} reached {cost}"
+    try:
+        _solve('adam', beta2 = 1.0)
+        assert False, "❌ Test failed: beta2 = 1.0 was accepted"
+    except ValueError as e:
+        print(f"✅ Test passed: {e}")
+    print("15. ✅ VanillaOptim first-order variants test passed")
+
+@vectorized_constraint
+def _trap_positive(u):
+    # every positive input is pushed onto the upper bound, away from the optimum at -1
+    return np.where(u > 0, u - 2.0, 0.0)
+
+def test_vanilla_optim_restarts():
+    system = LinearSystem(sys_dim = 2,
+                          input_dim = 1,
+                          input_space = {'1':{'continuous': [-2.0, 2.0]}},
+                          sys_name = "TestSystem")
+    preds = np.array([[1.0, 0.0]])
+    costs = {}
+    for restarts in (1, 8):
+        costs[restarts] = []
+        for seed in range(10):
+            profiler = Profiler()
+            optimizer = VanillaOptim(system = system, horizon = 1, optimizer_type = 'momentum', max_iterations = 200,
+                                     constraints = {'trap' : _trap_positive}, restarts = restarts, seed = seed,
+                                     profiler = profiler)
+            C, U = optimizer.optimize(preds)
+            assert U.shape == (1, 2), f"❌ Test failed: restarts = {restarts} returned inputs of shape {U.shape}"
+            assert profiler.counters['cost_evaluations'] == restarts * profiler.counters['iterations'],\
+                f"❌ Test failed: restarts were not scored as one batch {profiler.counters}"
+            costs[restarts].append(C[0])
+    assert max(costs[1]) > 1, f"❌ Test failed: no single start fell into the trap {costs[1]}"
+    assert max(costs[8]) < 0.01, f"❌ Test failed: 8 restarts still got trapped {costs[8]}"
+    # one start or many, 'gradient' is the same descent and settles on the same optimum
+    system = LinearSystem(sys_dim = 2, input_dim = 1, input_space = {'1':{'continuous': [-5.0, 5.0]}},
+                          sys_name = "TestSystem", seed = 0)
+    for restarts in (1, 4):
+        optimizer = VanillaOptim(system = system, horizon = 1, optimizer_type = 'gradient', alpha = 0.1,
+                                 max_iterations = 500, tolerance = 1e-4, restarts = restarts, seed = 0)
+        C, U = optimizer.optimize(np.array([[1.0, 0.0]]))
+        assert np.isclose(U[0, 0], -1.0, atol = 1e-3), f"❌ Test failed: restarts = {restarts} settled at {U[0]}"
+    for kwargs in ({'optimizer_type' : 'genetic'}, {'joint_horizon' : True}, {'restarts' : 0}):
+        try:
+            VanillaOptim(system = system, horizon = 1, **{'restarts' : 4, **kwargs})
+            assert False, f"❌ Test failed: restarts with {kwargs} was accepted"
+        except ValueError as e:
+            print(f"✅ Test passed: {e}")
+    print("16. ✅ VanillaOptim batched restarts test passed")
 
 if __name__ == "__main__":
     test_optimizer_schema()
-    test_vanilla_optim()
\ No newline at end of file
+    test_vanilla_optim()
+    test_vanilla_optim_vectorized()
+    test_vanilla_optim_analytic()
+    test_vanilla_optim_joint_horizon()
+    test_vanilla_optim_warm_start()
+    test_vanilla_optim_constraints()
+    test_vanilla_optim_validation()
+    test_vanilla_optim_plot()
+    test_vanilla_optim_stopping()
+    test_vanilla_optim_time_budget()
+    test_vanilla_optim_first_order()
+    test_vanilla_optim_restarts()
\ No newline at end of file
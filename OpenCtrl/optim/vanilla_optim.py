@@ -1,18 +1,21 @@
-import inspect
+import time
 import numpy as np
-import matplotlib.pyplot as plt
 from .optimizer_schema import OptimizerSchema
 from OpenCtrl.SystemDynamicExample.base_sys import BaseSystem
-from OpenCtrl.SystemDynamicExample.schemas import InputSpace
+from OpenCtrl.SystemDynamicExample.schemas import InputSpaceTable
+from OpenCtrl.verbose_cli.plot import CostPlot
+from OpenCtrl.rng import SeedLike
+from OpenCtrl.profiling import Profiler
+from .stopping import StoppingCriterion, UNCONVERGED_REASONS
 from typing import Literal, Dict, Callable, Optional, List, Tuple, Union
 
 def assert_params(**args):
     if 'preds' in args:
         if not len(args['preds']) > 0 and len(args['preds']) == args['horizon']:
             raise ValueError("Predictions must be a non-empty list with length equal to the horizon.")
-        if not isinstance(args['preds'], list):
-            raise TypeError(f"Predictions must be a list but got {type(args['preds'])}.")
-        if not all(isinstance(x, np.ndarray) for x in args['preds']):
+        if not isinstance(args['preds'], (list, np.ndarray)):
+            raise TypeError(f"Predictions must be a np.ndarray or a list but got {type(args['preds'])}.")
+        if isinstance(args['preds'], list) and not all(isinstance(x, np.ndarray) for x in args['preds']):
             raise TypeError(f"All elements in predictions must a ndarray.")
     if 'x' in args:
         if not isinstance(args['x'], np.ndarray):
@@ -26,13 +29,17 @@ def assert_params(**args):
     if 'verbose' in args:
         if not isinstance(args['verbose'], bool):
             raise TypeError(f"verbose must be a boolean but got {type(args['verbose'])}.")
+    if 'deadline' in args and args['deadline'] is not None:
+        if not isinstance(args['deadline'], float):
+            raise TypeError(f"deadline must be a time.perf_counter() float or None but got {type(args['deadline'])}.")
         
 class VanillaOptim(OptimizerSchema):
     def __init__(self,
                  system : BaseSystem,
                  horizon : int,
                  cost_function : Literal['quadratic', 'linear'] = 'quadratic',
-                 optimizer_type : Literal['gradient', 'genetic', 'random'] = 'gradient',
+                 optimizer_type : Literal['gradient', 'genetic', 'random', 'analytic',
+                                          'momentum', 'nesterov', 'adam', 'projected'] = 'gradient',
                  alpha : float = 0.01,
                  population_size : int = 100,
                  cross_over_rate : float = 0.7,
@@ -42,7 +49,20 @@ class VanillaOptim(OptimizerSchema):
                  tolerance_step : int = 50,
                  threshold : float = 0.005, 
                  tolerance : float = 1e-3,
-                 constraints : Optional[Dict[str, Callable]] = None
+                 constraints : Optional[Dict[str, Callable]] = None,
+                 vectorized : bool = False,
+                 batch_size : int = 64,
+                 joint_horizon : bool = False,
+                 warm_start : bool = False,
+                 validate : Optional[bool] = None,
+                 plot_every : int = 50,
+                 seed : SeedLike = None,
+                 profiler : Optional[Profiler] = None,
+                 stopping : Optional[List[StoppingCriterion]] = None,
+                 time_budget_ms : Optional[float] = None,
+                 momentum : float = 0.9,
+                 beta2 : float = 0.999,
+                 restarts : int = 1
                  ) -> None:
         super().__init__(system = system, 
                          horizon = horizon, 
@@ -57,146 +77,488 @@ class VanillaOptim(OptimizerSchema):
                          tolerance_step = tolerance_step,
                          threshold = threshold,
                          tolerance = tolerance, 
-                         constraints = constraints)
+                         constraints = constraints,
+                         vectorized = vectorized,
+                         batch_size = batch_size,
+                         joint_horizon = joint_horizon,
+                         warm_start = warm_start,
+                         validate = validate,
+                         plot_every = plot_every,
+                         seed = seed,
+                         profiler = profiler,
+                         stopping = stopping,
+                         time_budget_ms = time_budget_ms,
+                         momentum = momentum,
+                         beta2 = beta2,
+                         restarts = restarts)
         self.cost = self.quadratic_cost if self.cost_function == 'quadratic' else self.linear_cost
-        self.optim = self.gradient_descent if self.optimizer_type == 'gradient' else (
-            self.genetic_algorithm if self.optimizer_type == 'genetic' else self.random_search
-        )
-        self.input_space_mask = None
-        self.bucket = 0
+        self._cost = self._quadratic_cost if self.cost_function == 'quadratic' else self._linear_cost
+        self.optim = {'gradient' : self.gradient_descent,
+                      'genetic' : self.genetic_algorithm,
+                      'random' : self.random_search,
+                      'analytic' : self.analytic_solution,
+                      'momentum' : self.first_order_descent,
+                      'nesterov' : self.first_order_descent,
+                      'adam' : self.first_order_descent,
+                      'projected' : self.first_order_descent}[self.optimizer_type]
+        if self.restarts > 1:
+            self.optim = self.multi_start_descent
+        self.warm_U = None
+        self.n_systems = getattr(self.system, 'n_systems', None)
+        self.cost_plot = None
+        self.stop_reasons = []
+        # systems that do not compile their input space (custom BaseSystem subclasses) get it here
+        self.bounds = self.system.input_table if hasattr(self.system, 'input_table') else InputSpaceTable(self.system.u)
+        self.input_space_mask = self.bounds.mask.copy()
 
     def optimize(self,
-                 preds : List[np.ndarray],
-                 verbose : Optional[bool] = False
-                ) -> Tuple[List[float], List[np.ndarray]]:
-        args = locals()
-        assert_params(**args)
+                 preds : Union[np.ndarray, List[np.ndarray]],
+                 verbose : Optional[bool] = False,
+                 deadline : Optional[float] = None
+                ) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        preds is a (horizon, sys_dim) array, or (horizon, n_systems, sys_dim) for a fleet; a list
+        of per-step arrays is accepted as well. Returns the per-step costs and inputs stacked the
+        same way. deadline (a time.perf_counter() value) and time_budget_ms bound the whole call:
+        once passed, the running solve returns its best-so-far input, the steps not yet solved
+        take _timed_out without iterating, and converged turns False.
+        '''
+        if self.validate:
+            assert_params(**locals())
+        if self.time_budget_ms is not None:
+            budget = time.perf_counter() + self.time_budget_ms / 1e3
+            deadline = budget if deadline is None else min(deadline, budget)
+        self.deadline.at = deadline
+        self.stop_reasons = []
         if verbose:
-            self.cost_verbose = []
+            if self.cost_plot is None:
+                self.cost_plot = CostPlot(self.max_iterations * self.horizon, self.plot_every)
+            self.cost_plot.reset()
         if len(preds) != self.horizon:
             raise ValueError(f"Predictions must have length equal to the horizon ({self.horizon}) but got {len(preds)}.")
+        preds = np.asarray(preds, dtype = float)
+        # a joint solve that cannot start in time goes down the per-step path, where every step times out
+        joint = self.joint_horizon and not self.deadline.expired()
+        if joint or self.n_systems is not None:
+            C, U = self._optimize_joint(preds, verbose) if joint else self._optimize_fleet(preds, verbose)
+            self._store_warm_start(U)
+            if verbose:
+                self.cost_plot.flush()
+            return C, U
         x = self.system.x
         U = []
         C = []
         for horizon in range(self.horizon):
-            x = self.project(x, preds[horizon])
-            cost, u = self.optim(x, verbose, horizon)
+            x = x + preds[horizon]
+            cost, u = self._timed_out(x, horizon) if self.deadline.expired() else self.optim(x, verbose, horizon)
             x = self.system.mpc_step(u,preds[horizon])
             U.append(u)
             C.append(cost)
+        U, C = np.array(U, dtype = float), np.array(C, dtype = float)
+        self._store_warm_start(U)
+        if verbose:
+            self.cost_plot.flush()
         return C,U
+
+    def _store_warm_start(self,
+                          U : np.ndarray
+                          ) -> None:
+        '''Keep the plan shifted by one step: only U[0] is applied, U[1:] seeds the next call.'''
+        if self.warm_start:
+            self.warm_U = np.concatenate([U[1:], U[-1:]])
+
+    def _get_warm_u(self,
+                    horizon : Optional[Union[int, None]] = None
+                    ) -> Union[np.ndarray, None]:
+        if self.warm_U is None or horizon is None:
+            return None
+        return self.warm_U[horizon].copy()
+
+    def reset_warm_start(self) -> None:
+        self.warm_U = None
+
+    @property
+    def converged(self) -> bool:
+        '''Whether every solve of the last optimize call settled rather than hit max_iterations or the deadline.'''
+        return not any(reason in UNCONVERGED_REASONS for reason in self.stop_reasons)
     
+    def _optimize_joint(self,
+                        preds : np.ndarray,
+                        verbose : Optional[bool] = False
+                        ) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Projected gradient descent over the whole (horizon, sys_dim) input sequence. States are
+        propagated with system.mpc_rollout, so step h sees every input and prediction before it,
+        and the gradient w.r.t. U[h] is the reverse cumulative sum of the per-step gradients.
+        The first-order optimizer types swap in their update rule via _first_order_step.
+        '''
+        def _sequence_gradient(X : np.ndarray,
+                               costs : np.ndarray
+                               ) -> np.ndarray:
+            return np.cumsum(self._batch_gradient(X, 0, costs)[::-1], axis = 0)[::-1]
+
+        def _gradient(U : np.ndarray) -> np.ndarray:
+            X = self.system.mpc_rollout(U, phi)
+            return _sequence_gradient(X, self._batch_cost(X, 0))
+        phi = preds[:, None] if self.n_systems is not None and preds.ndim == 2 else preds
+        U = self.warm_U.copy() if self.warm_U is not None\
+            else self._get_random_population((self.horizon,) + np.shape(self.system.x)[:-1])
+        U = self._constrain(U, self.system.mpc_rollout(U, phi)) if self.constraints else U
+        state = self._first_order_state(U)
+        # the stacked rollout is a lower-triangular map whose squared norm grows with horizon**2,
+        # so the step is capped there to keep long horizons stable; adam normalizes the gradient away
+        step = self.alpha if self.optimizer_type == 'adam' else min(self.alpha, 1 / (2 * self.horizon ** 2))
+        cost_min = float('inf')
+        best_C, best_U = None, None
+        self.stopping.reset()
+        reason = 'max_iterations'
+        for _ in range(self.max_iterations):
+            X = self.system.mpc_rollout(U, phi)
+            costs = self._batch_cost(X, 0)
+            cost = costs.sum().item()
+            if cost < cost_min:
+                cost_min, best_C, best_U = cost, costs, U
+            if cost < self.tolerance:
+                reason = 'tolerance'
+                break
+            U, grad = self._first_order_step(U, _sequence_gradient(X, costs), state, step, _gradient)
+            U = self._constrain(U, X) * self.input_space_mask if self.constraints else U
+            if verbose:
+                self._show_cost_plot(cost, _)
+            stop = self.stopping(cost, grad)
+            if stop is not None:
+                reason = stop
+                break
+        self._solved(reason, _ + 1, (_ + 1) * costs.size)
+        return best_C, best_U
+
+    def _optimize_fleet(self,
+                        preds : np.ndarray,
+                        verbose : Optional[bool] = False
+                        ) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        optimize for a LinearSystemBatch: every horizon step solves all n_systems plants at once,
+        returning per-step costs of shape (n_systems,) and inputs of shape (n_systems, sys_dim).
+        '''
+        x = self.system.x
+        U = []
+        C = []
+        for horizon in range(self.horizon):
+            x = x + preds[horizon]
+            cost, u = self._timed_out(x, horizon) if self.deadline.expired() else self._solve_fleet(x, verbose, horizon)
+            x = self.system.mpc_step(u, preds[horizon])
+            U.append(u)
+            C.append(cost)
+        return np.array(C), np.array(U)
+
+    def _solve_fleet(self,
+                     x : np.ndarray,
+                     verbose : Optional[bool] = False,
+                     horizon : Optional[Union[int, None]] = None
+                     ) -> Tuple[np.ndarray, np.ndarray]:
+        n_systems = x.shape[0]
+        if self.optimizer_type == 'genetic':
+            return self._genetic_fleet(x, verbose, horizon)
+        if self.optimizer_type == 'analytic' and not (self.constraints or self.bounds.discrete.any()):
+            u = self.bounds.clip(-x)
+            self._solved('closed_form', 1, n_systems)
+            return self._batch_cost(x, u), u
+        warm_u = self._get_warm_u(horizon)
+        u = warm_u if warm_u is not None else self._get_random_population(n_systems)
+        best_cost = np.full(n_systems, float('inf'))
+        best_u = u.copy()
+        state = self._first_order_state(u)
+        self.stopping.reset()
+        reason = 'max_iterations'
+        for _ in range(self.max_iterations):
+            if self.optimizer_type == 'random':
+                candidates = self._get_random_population((self.batch_size, n_systems))
+                if _ == 0:
+                    candidates[0] = u
+                candidates = self._constrain(candidates, np.broadcast_to(x, candidates.shape)) if self.constraints else candidates
+                costs = self._batch_cost(x, candidates)
+                index = np.argmin(costs, axis = 0)
+                u = candidates[index, np.arange(n_systems)]
+                costs = costs[index, np.arange(n_systems)]
+            else:
+                costs = self._batch_cost(x, u)
+            improved = costs < best_cost
+            best_cost = np.where(improved, costs, best_cost)
+            best_u[improved] = u[improved]
+            if np.all(best_cost < self.tolerance):
+                reason = 'tolerance'
+                break
+            grad = None
+            if self.optimizer_type != 'random':
+                u, grad = self._first_order_step(u, self._batch_gradient(x, u, costs), state, self.alpha,
+                                                 lambda v : self._batch_gradient(x, v, self._batch_cost(x, v)))
+                u = self._constrain(u, x) * self.input_space_mask if self.constraints else u
+            cost = best_cost.sum().item()
+            if verbose:
+                self._show_cost_plot(cost, _, horizon)
+            stop = self.stopping(cost, grad)
+            if stop is not None:
+                reason = stop
+                break
+        self._solved(reason, _ + 1, (_ + 1) * costs.size * (self.batch_size if self.optimizer_type == 'random' else 1))
+        return best_cost, best_u
+
+    def _genetic_fleet(self,
+                       x : np.ndarray,
+                       verbose : Optional[bool] = False,
+                       horizon : Optional[Union[int, None]] = None
+                       ) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        _genetic_algorithm_vectorized for every plant at once: the populations are one
+        (n_systems, population_size, sys_dim) array, and selection, crossover and mutation index
+        along the plant axis, so a generation costs the same number of array calls for any fleet size.
+        '''
+        n_systems, dim = x.shape[0], self.bounds.lo.shape[0]
+        size = self.population_size
+        n_parents = max(1, round(size * self.cut_off_rate))
+        columns = np.arange(dim)
+        plants = np.arange(n_systems)[:, None]
+        states = np.broadcast_to(x[:, None], (n_systems, size, dim))
+        population = self._get_random_population((n_systems, size))
+        warm_u = self._get_warm_u(horizon)
+        population[:, 0] = warm_u if warm_u is not None else population[:, 0]
+        population = self._constrain(population, states) if self.constraints else population
+        best_cost = np.full(n_systems, float('inf'))
+        best_u = population[:, 0].copy()
+        self.stopping.reset()
+        reason = 'max_iterations'
+        for _ in range(self.max_iterations):
+            costs = self._batch_cost(x[:, None], population)
+            order = np.argsort(costs, axis = 1, kind = 'stable')
+            cost = costs[plants[:, 0], order[:, 0]]
+            improved = cost < best_cost
+            best_cost = np.where(improved, cost, best_cost)
+            best_u[improved] = population[improved, order[improved, 0]]
+            if np.all(best_cost < self.tolerance):
+                reason = 'tolerance'
+                break
+            parents = population[plants, order[:, :n_parents]]
+            pairs = self.rng.integers(0, n_parents, size = (n_systems, size, 2))
+            parent1, parent2 = parents[plants, pairs[..., 0]], parents[plants, pairs[..., 1]]
+            crossed = np.where(columns < self.rng.integers(0, dim, size = (n_systems, size, 1)), parent1, parent2)
+            picked = np.where(self.rng.random((n_systems, size, 1)) < 0.5, parent1, parent2)
+            children = np.where(self.rng.random((n_systems, size, 1)) < self.cross_over_rate, crossed, picked)
+            mutate = self.rng.random((n_systems, size, 1)) < self.mutation_rate
+            children = children + mutate * self.rng.normal(0, 1, size = children.shape) * self.input_space_mask
+            population = self.bounds.clip(children)
+            if self.constraints:
+                population = self._constrain(population, states) * self.input_space_mask
+            total = best_cost.sum().item()
+            if verbose:
+                self._show_cost_plot(total, _, horizon)
+            stop = self.stopping(total)
+            if stop is not None:
+                reason = stop
+                break
+        self._solved(reason, _ + 1, (_ + 1) * n_systems * size)
+        return best_cost, best_u
+
     def project(self,
                 x : np.ndarray,
                 phi : np.ndarray
                 ) -> np.ndarray:
-        args = locals()
-        assert_params(**args)
+        if self.validate:
+            assert_params(**locals())
         return x + phi
     
     def quadratic_cost(self,
                        x : np.ndarray,
                        u : np.ndarray
                        ) -> float:
-        args = locals()
-        assert_params(**args)
-        cost = np.linalg.norm((x + u) * self.input_space_mask, ord = 2)
-        return cost.item()
+        if self.validate:
+            assert_params(**locals())
+        return self._quadratic_cost(x, u)
+
+    def _quadratic_cost(self,
+                        x : np.ndarray,
+                        u : np.ndarray
+                        ) -> float:
+        return np.linalg.norm((x + u) * self.input_space_mask, ord = 2).item()
 
     def linear_cost(self,
                     x : np.ndarray,
                     u : np.ndarray
                     ) -> float:
-        args = locals()
-        assert_params(**args)
-        cost = np.linalg.norm(np.abs(x + u) * self.input_space_mask, ord = 1)
-        return cost.item()
+        if self.validate:
+            assert_params(**locals())
+        return self._linear_cost(x, u)
+
+    def _linear_cost(self,
+                     x : np.ndarray,
+                     u : np.ndarray
+                     ) -> float:
+        return np.linalg.norm(np.abs(x + u) * self.input_space_mask, ord = 1).item()
+
+    def _batch_cost(self,
+                    x : np.ndarray,
+                    U : np.ndarray
+                    ) -> np.ndarray:
+        '''Cost of every row of U (shape (n, sys_dim)) in a single norm call.'''
+        if self.cost_function == 'quadratic':
+            return np.linalg.norm((x + U) * self.input_space_mask, ord = 2, axis = -1)
+        return np.linalg.norm(np.abs(x + U) * self.input_space_mask, ord = 1, axis = -1)
+
+    def _batch_gradient(self,
+                        x : np.ndarray,
+                        U : np.ndarray,
+                        costs : np.ndarray
+                        ) -> np.ndarray:
+        '''Gradient of the cost w.r.t. every row of U, costs being _batch_cost(x, U).'''
+        if self.cost_function == 'quadratic':
+            return 2 * (x + U) * self.input_space_mask
+        return costs[..., None] * (x + U) / (np.linalg.norm(x + U, ord = 1, axis = -1, keepdims = True) + 0.001)\
+               * self.input_space_mask
+
+    def _constrain(self,
+                   U : np.ndarray,
+                   X : np.ndarray
+                   ) -> np.ndarray:
+        '''
+        _validate_constraints applied to every row of U against the matching row of X. Vectorized
+        constraints get the whole (n, sys_dim) population in one call, the others are called per row.
+        '''
+        dim = U.shape[-1]
+        population = np.array(U, dtype = float).reshape(-1, dim)
+        states = np.broadcast_to(X, U.shape).reshape(-1, dim)
+        with self.profiler.phase('constraints'):
+            for constraint, params, vectorized in self._constraint_table:
+                if vectorized:
+                    population -= constraint(*[population if param == 'u' else states for param in params])
+                else:
+                    population -= np.array([constraint(*[u if param == 'u' else x for param in params])
+                                            for u, x in zip(population, states)])
+        return population.reshape(U.shape)
 
     def _validate_constraints(self, 
                               u : np.ndarray,
                               x : np.ndarray
                              ) -> np.ndarray:
-        for constraint in self.constraints.values():
-            sig = inspect.signature(constraint)
-            if len(sig.parameters) == 2:
-                params = []
-                for param in sig.parameters.values():
-                    if param.name == 'u':
-                        params.append(u)
-                    elif param.name == 'x':
-                        params.append(x)
-                satisfied = constraint(*params)
-            elif len(sig.parameters) == 1:
-                satisfied = constraint(u if 'u' in sig.parameters else x)
-            u -= satisfied
+        with self.profiler.phase('constraints'):
+            for constraint, params, vectorized in self._constraint_table:
+                if vectorized:
+                    satisfied = constraint(*[u[None] if param == 'u' else x[None] for param in params])[0]
+                else:
+                    satisfied = constraint(*[u if param == 'u' else x for param in params])
+                u -= satisfied
         return u
         
     def _get_random_u(self) -> np.ndarray:
-        u = np.array([0 if not isinstance(u, InputSpace) \
-                            else (np.random.uniform(u.min_value, u.max_value)\
-                                if not hasattr(u, 'step') \
-                                else np.random.choice(list(range(u.min_value, u.max_value, u.step))))\
-                                                                    for u in self.system.u])
-        self.input_space_mask = np.where(u == 0, 0, 1 ).astype(float) if self.input_space_mask is None\
-                                else self.input_space_mask
-        return u
-    
+        return self.bounds.sample(self.rng)
+
+    def _get_random_population(self,
+                               size : Union[int, Tuple[int, ...]]
+                               ) -> np.ndarray:
+        '''_get_random_u for a whole population, returning an array of shape (*size, sys_dim).'''
+        return self.bounds.sample(self.rng, size)
+
     def _clip_u(self, 
                 U : np.ndarray
                 ) -> np.ndarray:
-        u_clipped = []
-        for u, u_obj in zip(U,self.system.u):
-            
-            if isinstance(u_obj, InputSpace):
-                u_clipped.append(np.clip(u,min=u_obj.min_value,max = u_obj.max_value))
-            else:
-                u_clipped.append(0)
-        return np.array(u_clipped)
+        return self.bounds.clip(U)
+
     def _show_cost_plot(self,
                         cost : float,
                         iter : int,
                         horizon : Optional[Union[int, None]] = None
                         ) -> None:
-        self.cost_verbose.append(cost) 
-        plt.plot(self.cost_verbose, label = 'Cost over iterations')
-        plt.xlabel('Iteration')
-        plt.ylabel('Cost')
-        if horizon is not None:
-            plt.title(f'Cost Minimization - Horizon : {horizon + 1}')
-        else:
-            plt.title('Cost Minimization')
-        plt.draw()
-        plt.pause(0.01)
-        if iter - 1 != self.max_iterations:
-            plt.clf()
-    def _check_tolerance(self,
-                         prev_cost : float,
-                         curr_cost : float
-                         ) -> bool:
-        if self.tolerance_step == 0 or self.tolerance_step > self.max_iterations * 0.90:
-            return False
-        if (prev_cost - curr_cost) < self.threshold:
-            self.bucket += 1
-            return True if self.bucket >= self.tolerance_step else False
+        if self.cost_plot is None:
+            self.cost_plot = CostPlot(self.max_iterations, self.plot_every)
+        self.cost_plot.record(cost, horizon)
+
+    def _first_order_state(self,
+                           u : np.ndarray
+                           ) -> Dict[str, Union[np.ndarray, int]]:
+        '''Per-solve velocity (momentum, nesterov) and moment estimates (adam) for _first_order_step.'''
+        return {'v' : np.zeros_like(u, dtype = float),
+                'm' : np.zeros_like(u, dtype = float),
+                's' : np.zeros_like(u, dtype = float),
+                't' : 0}
+
+    def _first_order_step(self,
+                          u : np.ndarray,
+                          grad : np.ndarray,
+                          state : Dict[str, Union[np.ndarray, int]],
+                          step : float,
+                          gradient : Callable[[np.ndarray], np.ndarray]
+                          ) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        One optimizer_type update of u, grad being the gradient at u and gradient(v) the one at
+        any other point (for Nesterov's look-ahead). The iterate is clipped onto the input bounds,
+        and momentum / nesterov keep the velocity actually travelled after clipping. Returns the
+        new iterate and the gradient handed to the stopping rules; for 'projected' that is the
+        gradient mapping (u - new) / step, which vanishes at the bounded optimum.
+        '''
+        if self.optimizer_type in ('momentum', 'nesterov'):
+            if self.optimizer_type == 'nesterov':
+                grad = gradient(self.bounds.clip(u + self.momentum * state['v']))
+            new = self.bounds.clip(u + self.momentum * state['v'] - step * grad)
+            state['v'] = new - u
+        elif self.optimizer_type == 'adam':
+            state['t'] += 1
+            state['m'] = self.momentum * state['m'] + (1 - self.momentum) * grad
+            state['s'] = self.beta2 * state['s'] + (1 - self.beta2) * grad ** 2
+            m = state['m'] / (1 - self.momentum ** state['t'])
+            v = state['s'] / (1 - self.beta2 ** state['t'])
+            new = self.bounds.clip(u - step * m / (np.sqrt(v) + 1e-8))
         else:
-            self.bucket = 0
-            return False
+            new = self.bounds.clip(u - step * grad)
+            if self.optimizer_type == 'projected':
+                grad = (u - new) / step
+        return new, grad
+
+    def _timed_out(self,
+                   x : np.ndarray,
+                   horizon : Optional[Union[int, None]] = None
+                   ) -> Tuple[Union[float, np.ndarray], np.ndarray]:
+        '''
+        Stand-in for a solve the deadline ran out before: the warm start if there is one, else
+        clip(-x), the unconstrained minimizer of both costs, scored once without iterating.
+        Works for a single state or a (n_systems, sys_dim) fleet.
+        '''
+        u = self._get_warm_u(horizon)
+        u = self.bounds.clip(-x) if u is None else u
+        u = self._constrain(u, x) * self.input_space_mask if self.constraints else u
+        cost = self._batch_cost(x, u)
+        self._solved('time_budget', 0, cost.size)
+        return (cost.item() if cost.ndim == 0 else cost), u
+
+    def _solved(self,
+                reason : str,
+                iterations : int,
+                evaluations : int
+                ) -> None:
+        '''Record why one solve stopped, and report it with the work it took to the profiler.'''
+        self.stop_reasons.append(reason)
+        self.profiler.count('solves')
+        self.profiler.count('iterations', iterations)
+        self.profiler.count('cost_evaluations', evaluations)
+        self.profiler.stop(reason)
 
     def random_search(self,
                       x : np.ndarray,
                       verbose : Optional[bool] = False,
                       horizon : Optional[Union[int, None]] = None
                       ) -> Tuple[float, np.ndarray]:
-        args = locals()
-        assert_params(**args)
+        if self.validate:
+            assert_params(**locals())
+        if self.vectorized:
+            return self._random_search_vectorized(x, verbose, horizon)
         cost_min = float('inf')
         best_u = None
-        u = self._get_random_u()
+        u = self._get_warm_u(horizon)
+        u = self._get_random_u() if u is None else u
         u = self._validate_constraints(u, x) if self.constraints else u
-        prev_cost = cost_min
+        self.stopping.reset()
+        reason = 'max_iterations'
         for _ in range(self.max_iterations):
-            cost = self.cost(x, u)
+            cost = self._cost(x, u)
             if cost < self.tolerance:
+                self._solved('tolerance', _ + 1, _ + 1)
                 return cost, u
             cost_min = min(cost_min, cost)
             best_u = u if cost == cost_min else best_u
@@ -204,50 +566,189 @@ class VanillaOptim(OptimizerSchema):
             u = self._validate_constraints(u, x) if self.constraints else u
             if verbose:
                 self._show_cost_plot(cost, _, horizon)
-            if self._check_tolerance(prev_cost,cost):
+            stop = self.stopping(cost)
+            if stop is not None:
+                reason = stop
                 break
-            prev_cost = cost
+        self._solved(reason, _ + 1, _ + 1)
         return cost_min, best_u
     
+    def _random_search_vectorized(self,
+                                  x : np.ndarray,
+                                  verbose : Optional[bool] = False,
+                                  horizon : Optional[Union[int, None]] = None
+                                  ) -> Tuple[float, np.ndarray]:
+        '''
+        random_search drawing batch_size candidates per iteration from the compiled input space
+        tables and scoring them with one vectorized norm.
+        '''
+        cost_min = float('inf')
+        best_u = None
+        self.stopping.reset()
+        warm_u = self._get_warm_u(horizon)
+        reason = 'max_iterations'
+        for _ in range(self.max_iterations):
+            candidates = self._get_random_population(self.batch_size)
+            if _ == 0 and warm_u is not None:
+                candidates[0] = warm_u
+            if self.constraints:
+                candidates = self._constrain(candidates, np.broadcast_to(x, candidates.shape))
+            costs = self._batch_cost(x, candidates)
+            index = np.argmin(costs)
+            cost = costs[index].item()
+            if cost < self.tolerance:
+                self._solved('tolerance', _ + 1, (_ + 1) * self.batch_size)
+                return cost, candidates[index]
+            if cost < cost_min:
+                cost_min, best_u = cost, candidates[index]
+            if verbose:
+                self._show_cost_plot(cost, _, horizon)
+            stop = self.stopping(cost)
+            if stop is not None:
+                reason = stop
+                break
+        self._solved(reason, _ + 1, (_ + 1) * self.batch_size)
+        return cost_min, best_u
+
+    def analytic_solution(self,
+                          x : np.ndarray,
+                          verbose : Optional[bool] = False,
+                          horizon : Optional[Union[int, None]] = None
+                          ) -> Tuple[float, np.ndarray]:
+        '''
+        Exact minimizer of the quadratic and linear costs. Both are separable per dimension, so
+        under box bounds the optimum is clip(-x) on the controllable dimensions. Discrete inputs
+        and constraints break that, in which case gradient_descent is used instead.
+        '''
+        if self.validate:
+            assert_params(**locals())
+        if self.constraints or self.bounds.discrete.any():
+            return self.gradient_descent(x, verbose, horizon)
+        u = self.bounds.clip(-x)
+        self._solved('closed_form', 1, 1)
+        return self._cost(x, u), u
+
     def gradient_descent(self,
                          x : np.ndarray,
                          verbose : Optional[bool] = False,
                          horizon : Optional[Union[int, None]] = None
                          ) -> Tuple[float, np.ndarray]:
-        def _compute_gradient(u : np.ndarray,
-                              x : np.ndarray,
-                             cost : float
-                             ) -> Tuple[float,np.ndarray]:
-            if self.cost_function == 'quadratic':
-                return (2 * (x.T * np.ones_like(x)) + u ) * self.input_space_mask
-            else:
-                return cost * ((x + u)/(np.linalg.norm(x + u, ord = 1) + 0.001)) * self.input_space_mask
-        args = locals()
-        assert_params(**args)
+        if self.validate:
+            assert_params(**locals())
         cost_min = float('inf')
         best_u = None
-        u = self._get_random_u().astype(float)
+        u = self._get_warm_u(horizon)
+        u = self._get_random_u().astype(float) if u is None else np.array(u, dtype = float)
         u = self._validate_constraints(u,x) if self.constraints else u
-        prev_cost = cost_min
+        self.stopping.reset()
+        reason = 'max_iterations'
         for _ in range(self.max_iterations):
-            cost = self.cost(x, u)
+            cost = self._cost(x, u)
             if cost < self.tolerance:
+                self._solved('tolerance', _ + 1, _ + 1)
                 return cost, u
             cost_min = min(cost_min, cost)
-            best_u = u if cost == cost_min else best_u
-            grad = _compute_gradient(u,x,cost)
-            u -= self.alpha * self.input_space_mask * grad
+            best_u = u.copy() if cost == cost_min else best_u
+            grad = self._batch_gradient(x, u, np.asarray(cost))
+            u = u - self.alpha * grad
             u = self._clip_u(u)
 
             u = self._validate_constraints(u, x) * self.input_space_mask if self.constraints\
                 else u
             if verbose:
                 self._show_cost_plot(cost, _, horizon)
-            # if self._check_tolerance(prev_cost,cost):
-            #     break
-            # prev_cost = cost
+            stop = self.stopping(cost, grad)
+            if stop is not None:
+                reason = stop
+                break
+        self._solved(reason, _ + 1, _ + 1)
         return cost_min, best_u
     
+    def first_order_descent(self,
+                            x : np.ndarray,
+                            verbose : Optional[bool] = False,
+                            horizon : Optional[Union[int, None]] = None
+                            ) -> Tuple[float, np.ndarray]:
+        '''
+        gradient_descent with the 'momentum', 'nesterov', 'adam' or 'projected' update rule of
+        _first_order_step, scored by the vectorized _batch_cost / _batch_gradient.
+        '''
+        if self.validate:
+            assert_params(**locals())
+        cost_min = float('inf')
+        best_u = None
+        u = self._get_warm_u(horizon)
+        u = self._get_random_u().astype(float) if u is None else np.array(u, dtype = float)
+        u = self._validate_constraints(u, x) if self.constraints else u
+        state = self._first_order_state(u)
+        evaluations = 2 if self.optimizer_type == 'nesterov' else 1
+        self.stopping.reset()
+        reason = 'max_iterations'
+        for _ in range(self.max_iterations):
+            costs = self._batch_cost(x, u)
+            cost = costs.item()
+            if cost < self.tolerance:
+                self._solved('tolerance', _ + 1, (_ + 1) * evaluations)
+                return cost, u
+            if cost < cost_min:
+                cost_min, best_u = cost, u
+            u, grad = self._first_order_step(u, self._batch_gradient(x, u, costs), state, self.alpha,
+                                             lambda v : self._batch_gradient(x, v, self._batch_cost(x, v)))
+            u = self._validate_constraints(u, x) * self.input_space_mask if self.constraints else u
+            if verbose:
+                self._show_cost_plot(cost, _, horizon)
+            stop = self.stopping(cost, grad)
+            if stop is not None:
+                reason = stop
+                break
+        self._solved(reason, _ + 1, (_ + 1) * evaluations)
+        return cost_min, best_u
+
+    def multi_start_descent(self,
+                            x : np.ndarray,
+                            verbose : Optional[bool] = False,
+                            horizon : Optional[Union[int, None]] = None
+                            ) -> Tuple[float, np.ndarray]:
+        '''
+        restarts descents run together as one (restarts, sys_dim) batch: every iteration scores,
+        differentiates and steps all of them with the vectorized cost and _first_order_step
+        ('gradient' takes plain clipped steps), and the cheapest iterate of any restart is
+        returned. A warm start, if any, seeds the first restart.
+        '''
+        if self.validate:
+            assert_params(**locals())
+        U = self._get_random_population(self.restarts)
+        warm_u = self._get_warm_u(horizon)
+        U[0] = warm_u if warm_u is not None else U[0]
+        X = np.broadcast_to(x, U.shape)
+        U = self._constrain(U, X) if self.constraints else U
+        state = self._first_order_state(U)
+        evaluations = self.restarts * (2 if self.optimizer_type == 'nesterov' else 1)
+        cost_min = float('inf')
+        best_u = None
+        self.stopping.reset()
+        reason = 'max_iterations'
+        for _ in range(self.max_iterations):
+            costs = self._batch_cost(x, U)
+            index = np.argmin(costs)
+            cost = costs[index].item()
+            if cost < cost_min:
+                cost_min, best_u = cost, U[index].copy()
+            if cost < self.tolerance:
+                reason = 'tolerance'
+                break
+            U, grad = self._first_order_step(U, self._batch_gradient(x, U, costs), state, self.alpha,
+                                             lambda V : self._batch_gradient(x, V, self._batch_cost(x, V)))
+            U = self._constrain(U, X) * self.input_space_mask if self.constraints else U
+            if verbose:
+                self._show_cost_plot(cost, _, horizon)
+            stop = self.stopping(cost, grad)
+            if stop is not None:
+                reason = stop
+                break
+        self._solved(reason, _ + 1, (_ + 1) * evaluations)
+        return cost_min, best_u
+
     def genetic_algorithm(self,
                           x : np.ndarray,
                           verbose : Optional[bool] = False,
@@ -256,28 +757,34 @@ class VanillaOptim(OptimizerSchema):
         def _crossover(parent1 : np.ndarray,
                        parent2 : np.ndarray
                        ) -> np.ndarray:
-            if np.random.rand() < self.cross_over_rate:
-                crossover_point = np.random.randint(0, parent1.shape[0])
+            if self.rng.random() < self.cross_over_rate:
+                crossover_point = self.rng.integers(0, parent1.shape[0])
                 child = np.concatenate((parent1[:crossover_point], parent2[crossover_point:]))
                 return child
             else: 
-                return parent1 if np.random.rand() < 0.5 else parent2
+                return parent1 if self.rng.random() < 0.5 else parent2
 
         def _mutate(u : np.ndarray,
                     ) -> np.ndarray:
-            if np.random.rand() < self.mutation_rate:
-                return u + (np.random.normal(0, 1, size = u.shape) * self.input_space_mask)
+            if self.rng.random() < self.mutation_rate:
+                return u + (self.rng.normal(0, 1, size = u.shape) * self.input_space_mask)
             return u
-        args = locals()
-        assert_params(**args)
+        if self.validate:
+            assert_params(**locals())
+        if self.vectorized:
+            return self._genetic_algorithm_vectorized(x, verbose, horizon)
         population = [self._get_random_u() for _ in range(self.population_size)]
+        warm_u = self._get_warm_u(horizon)
+        population[0] = warm_u if warm_u is not None else population[0]
         population = [u + self._validate_constraints(u, x)  for u in population] if self.constraints else population
         cost_min = float('inf')
         best_u = None
-        prev_cost = cost_min
+        self.stopping.reset()
+        reason = 'max_iterations'
         for _ in range(self.max_iterations):
-            costs = [self.cost(x, u) for u in population]
+            costs = [self._cost(x, u) for u in population]
             if min(costs) < self.tolerance:
+                self._solved('tolerance', _ + 1, (_ + 1) * len(costs))
                 return min(costs), population[costs.index(min(costs))]
             cost_min = min(cost_min, min(costs))
             best_u = population[costs.index(min(costs))] if min(costs) == cost_min else best_u
@@ -287,7 +794,7 @@ class VanillaOptim(OptimizerSchema):
             if verbose:
                 self._show_cost_plot(min(costs), _, horizon)
             while len(next_generation) <= self.population_size:
-                parent1, parent2 = np.random.choice(list(range(0,len(population))), size = 2, replace= True)
+                parent1, parent2 = self.rng.choice(list(range(0,len(population))), size = 2, replace= True)
                 child = _crossover(population[parent1], population[parent2])
                 child = _mutate(child)
                 child = self._clip_u(child)
@@ -295,7 +802,59 @@ class VanillaOptim(OptimizerSchema):
                        else child 
                 next_generation.append(child)
             population = next_generation
-            if self._check_tolerance(prev_cost,min(costs)):
+            stop = self.stopping(min(costs))
+            if stop is not None:
+                reason = stop
+                break
+        self._solved(reason, _ + 1, (_ + 1) * len(costs))
+        return cost_min, best_u
+    def _genetic_algorithm_vectorized(self,
+                                      x : np.ndarray,
+                                      verbose : Optional[bool] = False,
+                                      horizon : Optional[Union[int,None]] = None
+                                      ) -> Tuple[float, np.ndarray]:
+        '''
+        Same truncation-selection GA as genetic_algorithm, with the population kept as a single
+        (population_size, sys_dim) array so scoring, selection, crossover, mutation and clipping
+        run as whole-array operations.
+        '''
+        size, dim = self.population_size, self.bounds.lo.shape[0]
+        n_parents = max(1, round(size * self.cut_off_rate))
+        columns = np.arange(dim)
+        population = self._get_random_population(size)
+        warm_u = self._get_warm_u(horizon)
+        population[0] = warm_u if warm_u is not None else population[0]
+        if self.constraints:
+            population = self._constrain(population, np.broadcast_to(x, population.shape))
+        cost_min = float('inf')
+        best_u = None
+        self.stopping.reset()
+        reason = 'max_iterations'
+        for _ in range(self.max_iterations):
+            costs = self._batch_cost(x, population)
+            order = np.argsort(costs, kind = 'stable')
+            cost = costs[order[0]].item()
+            if cost < self.tolerance:
+                self._solved('tolerance', _ + 1, (_ + 1) * size)
+                return cost, population[order[0]]
+            if cost < cost_min:
+                cost_min, best_u = cost, population[order[0]].copy()
+            parents = population[order[:n_parents]]
+            if verbose:
+                self._show_cost_plot(cost, _, horizon)
+            pairs = self.rng.integers(0, n_parents, size = (size, 2))
+            parent1, parent2 = parents[pairs[:, 0]], parents[pairs[:, 1]]
+            crossed = np.where(columns < self.rng.integers(0, dim, size = (size, 1)), parent1, parent2)
+            picked = np.where(self.rng.random((size, 1)) < 0.5, parent1, parent2)
+            children = np.where(self.rng.random((size, 1)) < self.cross_over_rate, crossed, picked)
+            mutate = self.rng.random((size, 1)) < self.mutation_rate
+            children = children + mutate * self.rng.normal(0, 1, size = children.shape) * self.input_space_mask
+            population = self.bounds.clip(children)
+            if self.constraints:
+                population = self._constrain(population, np.broadcast_to(x, population.shape)) * self.input_space_mask
+            stop = self.stopping(cost)
+            if stop is not None:
+                reason = stop
                 break
-            prev_cost = min(costs)
-        return cost_min, best_u
\ No newline at end of file
+        self._solved(reason, _ + 1, (_ + 1) * size)
+        return cost_min, best_u
@@ -0,0 +1,2 @@
+from .runner import EpisodeRunner, parallel_optimize
+__all__ = ["EpisodeRunner", "parallel_optimize"]
@@ -0,0 +1,126 @@
+import pickle
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from OpenCtrl.controls.control_schema import ControlSchema
+from OpenCtrl.optim.optimizer_schema import OptimizerSchema
+from OpenCtrl.rng import spawn_seeds
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+def assert_params(**args):
+    if 'controller' in args:
+        if not isinstance(args['controller'], ControlSchema):
+            raise TypeError(f"controller must be an instance of ControlSchema but got {type(args['controller'])}")
+    if 'optimizer' in args:
+        if not isinstance(args['optimizer'], OptimizerSchema):
+            raise TypeError(f"optimizer must be an instance of OptimizerSchema but got {type(args['optimizer'])}")
+    if 'preds' in args:
+        if not (callable(args['preds']) or isinstance(args['preds'], (list, np.ndarray))):
+            raise TypeError(f"preds must be a callable, list or np.ndarray but got {type(args['preds'])}")
+    for key in ['ticks', 'n_episodes', 'n_restarts']:
+        if key in args:
+            if not isinstance(args[key], int):
+                raise TypeError(f"{key} must be an integer but got {type(args[key])}")
+            if args[key] <= 0:
+                raise ValueError(f"{key} must be a positive integer but got {args[key]}")
+    if 'max_workers' in args and args['max_workers'] is not None:
+        if not isinstance(args['max_workers'], int):
+            raise TypeError(f"max_workers must be an integer or None but got {type(args['max_workers'])}")
+        if args['max_workers'] <= 0:
+            raise ValueError(f"max_workers must be a positive integer but got {args['max_workers']}")
+    if 'seed' in args and args['seed'] is not None:
+        if not isinstance(args['seed'], int):
+            raise TypeError(f"seed must be an integer or None but got {type(args['seed'])}")
+
+def _seed_worker(seed_seq : np.random.SeedSequence) -> None:
+    np.random.seed(seed_seq.generate_state(1)[0])
+
+def _run_episode(payload : bytes,
+                 seed_seq : np.random.SeedSequence
+                 ) -> Dict[str, np.ndarray]:
+    controller, preds, ticks, tune_kwargs = pickle.loads(payload)
+    _seed_worker(seed_seq)
+    controller.reseed(seed_seq)
+    trace = {'cost' : [], 'u' : [], 'x' : [], 'psi' : []}
+    for tick in range(ticks):
+        tick_preds = preds(tick, controller.system) if callable(preds) else preds[tick]
+        cost, u = controller.tune(preds = tick_preds, **tune_kwargs)
+        trace['cost'].append(np.asarray(cost, dtype = float))
+        trace['u'].append(np.asarray(u[0], dtype = float))
+        trace['x'].append(np.array(controller.system.x, dtype = float))
+        trace['psi'].append(np.asarray(controller.psi, dtype = float))
+    return {k : np.stack(v) for k, v in trace.items()}
+
+def _run_restart(payload : bytes,
+                 seed_seq : np.random.SeedSequence
+                 ) -> Tuple[np.ndarray, np.ndarray]:
+    optimizer, preds = pickle.loads(payload)
+    _seed_worker(seed_seq)
+    optimizer.reseed(seed_seq)
+    return optimizer.optimize(preds)
+
+def _map(fn : Callable,
+         payload : bytes,
+         seeds : List[np.random.SeedSequence],
+         max_workers : Optional[int]
+         ) -> List:
+    if max_workers == 1:
+        return [fn(payload, seed_seq) for seed_seq in seeds]
+    with ProcessPoolExecutor(max_workers = max_workers) as pool:
+        return list(pool.map(fn, [payload] * len(seeds), seeds))
+
+class EpisodeRunner:
+    '''
+    Runs n_episodes independent closed-loop episodes of `controller` across a process pool.
+
+    Every episode starts from a pickled copy of the controller (system and optimizer included)
+    and is reseeded with its own child of OpenCtrl.rng.spawn_seeds(seed), so traces are
+    reproducible and do not depend on max_workers or on which worker picked the episode up. `preds` is either an
+    array-like of shape (ticks, horizon, disturbance_dim) or a picklable (module level)
+    callable (tick, system) -> (horizon, disturbance_dim) array. Constraint functions on the optimizer must be
+    picklable as well.
+    '''
+    def __init__(self,
+                 controller : ControlSchema,
+                 preds : Union[Callable, np.ndarray, List],
+                 ticks : int,
+                 n_episodes : int,
+                 max_workers : Optional[int] = None,
+                 seed : Optional[int] = None,
+                 tune_kwargs : Optional[Dict] = None
+                 ) -> None:
+        args = locals()
+        assert_params(**args)
+        self.controller = controller
+        self.preds = preds
+        self.ticks = ticks
+        self.n_episodes = n_episodes
+        self.max_workers = max_workers
+        self.seed = seed
+        self.tune_kwargs = tune_kwargs if tune_kwargs is not None else {}
+
+    def run(self) -> Dict[str, np.ndarray]:
+        '''
+        Returns the stacked traces: cost (n_episodes, ticks, horizon), u and x
+        (n_episodes, ticks, sys_dim) and psi (n_episodes, ticks), plus the per-episode
+        total cost under 'episode_cost'.
+        '''
+        payload = pickle.dumps((self.controller, self.preds, self.ticks, self.tune_kwargs))
+        seeds = spawn_seeds(self.seed, self.n_episodes)
+        traces = _map(_run_episode, payload, seeds, self.max_workers)
+        results = {k : np.stack([t[k] for t in traces]) for k in traces[0]}
+        results['episode_cost'] = results['cost'].reshape(self.n_episodes, -1).sum(axis = 1)
+        return results
+
+def parallel_optimize(optimizer : OptimizerSchema,
+                      preds : Union[np.ndarray, List[np.ndarray]],
+                      n_restarts : int,
+                      max_workers : Optional[int] = None,
+                      seed : Optional[int] = None
+                      ) -> Tuple[np.ndarray, np.ndarray]:
+    '''Runs n_restarts independent optimizer.optimize calls in parallel and keeps the cheapest plan.'''
+    args = locals()
+    assert_params(**args)
+    payload = pickle.dumps((optimizer, preds))
+    seeds = spawn_seeds(seed, n_restarts)
+    solutions = _map(_run_restart, payload, seeds, max_workers)
+    return min(solutions, key = lambda solution : float(np.sum(solution[0])))
@@ -0,0 +1,40 @@
+import numpy as np
+from .runner import EpisodeRunner, parallel_optimize
+from OpenCtrl.SystemDynamicExample.linear_sys import LinearSystem
+from OpenCtrl.optim.vanilla_optim import VanillaOptim
+from OpenCtrl.controls.lac import LAC
+
+def _make_lac() -> LAC:
+    system = LinearSystem(sys_dim = 3, input_dim = 2,
+                          input_space = {'1':{'continuous': [-5.0, 5.0]}, '2':{'continuous': [-5.0, 5.0]}},
+                          disturbance_scale = [0, 1])
+    optimizer = VanillaOptim(system = system,
+                             horizon = 2,
+                             optimizer_type = 'random',
+                             max_iterations = 20,
+                             vectorized = True)
+    return LAC(system = system, optimizer = optimizer, horizon = 2)
+
+def test_episode_runner():
+    preds = np.random.default_rng(0).normal(0, 1, (5, 2, 3))
+    lac = _make_lac()
+    runner = EpisodeRunner(controller = lac, preds = preds, ticks = 5,
+                           n_episodes = 3, max_workers = 2, seed = 7)
+    results = runner.run()
+    assert results['cost'].shape == (3, 5, 2) and results['u'].shape == (3, 5, 3),\
+        f"❌ Test failed: traces have shapes cost {results['cost'].shape}, u {results['u'].shape}"
+    assert results['psi'].shape == (3, 5) and results['episode_cost'].shape == (3,),\
+        f"❌ Test failed: traces have shapes psi {results['psi'].shape}, episode_cost {results['episode_cost'].shape}"
+    serial = EpisodeRunner(controller = lac, preds = preds, ticks = 5,
+                           n_episodes = 3, max_workers = 1, seed = 7).run()
+    assert all(np.array_equal(results[k], serial[k]) for k in results),\
+        "❌ Test failed: pooled and serial runs with the same seed differ"
+    assert not np.array_equal(results['x'][0], results['x'][1]),\
+        "❌ Test failed: episodes share a random stream"
+    cost, u = parallel_optimize(lac.optim, list(preds[0]), n_restarts = 3, max_workers = 1, seed = 7)
+    assert len(cost) == 2 and len(u) == 2,\
+        f"❌ Test failed: parallel_optimize returned {len(cost)} costs and {len(u)} inputs"
+    print("✅ Test passed: EpisodeRunner runs seeded episodes across a process pool")
+
+if __name__ == "__main__":
+    test_episode_runner()
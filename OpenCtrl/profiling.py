@@ -0,0 +1,132 @@
+import json
+import time
+from typing import Callable, Dict, Optional
+
+def assert_params(**args):
+    if 'callback' in args and args['callback'] is not None:
+        if not callable(args['callback']):
+            raise TypeError(f"callback must be callable or None but got {type(args['callback'])}")
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self,
+                 profiler : 'Profiler',
+                 name : str
+                 ) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> '_Phase':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullPhase':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+_NULL_PHASE = _NullPhase()
+
+class Profiler:
+    '''
+    Opt-in instrumentation for the control loop. phase(name) is a context manager accumulating
+    wall time and call counts per phase, count() bumps named counters (iterations, cost
+    evaluations) and stop() tallies why each solve ended. callback, if given, is called as
+    callback(name, seconds) whenever a phase closes.
+    '''
+    enabled = True
+
+    def __init__(self,
+                 callback : Optional[Callable[[str, float], None]] = None
+                 ) -> None:
+        assert_params(callback = callback)
+        self.callback = callback
+        self.reset()
+
+    def reset(self) -> None:
+        self.times = {}
+        self.calls = {}
+        self.counters = {}
+        self.stop_reasons = {}
+
+    def phase(self,
+              name : str
+              ) -> _Phase:
+        return _Phase(self, name)
+
+    def add_time(self,
+                 name : str,
+                 seconds : float
+                 ) -> None:
+        self.times[name] = self.times.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def count(self,
+              name : str,
+              n : Optional[int] = 1
+              ) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def stop(self,
+             reason : str
+             ) -> None:
+        self.stop_reasons[reason] = self.stop_reasons.get(reason, 0) + 1
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {'phases' : {name : {'calls' : self.calls[name],
+                                    'total_ms' : total * 1e3,
+                                    'mean_ms' : total * 1e3 / self.calls[name]}
+                            for name, total in self.times.items()},
+                'counters' : dict(self.counters),
+                'stop_reasons' : dict(self.stop_reasons)}
+
+    def to_json(self,
+                path : Optional[str] = None,
+                indent : Optional[int] = 2
+                ) -> str:
+        '''The to_dict report as JSON, also written to path when one is given.'''
+        report = json.dumps(self.to_dict(), indent = indent)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(report)
+        return report
+
+class NullProfiler(Profiler):
+    '''Default profiler: every hook is a no-op and phase() hands back one shared context.'''
+    enabled = False
+
+    def __init__(self) -> None:
+        self.callback = None
+        self.reset()
+
+    def phase(self,
+              name : str
+              ) -> _NullPhase:
+        return _NULL_PHASE
+
+    def add_time(self,
+                 name : str,
+                 seconds : float
+                 ) -> None:
+        return None
+
+    def count(self,
+              name : str,
+              n : Optional[int] = 1
+              ) -> None:
+        return None
+
+    def stop(self,
+             reason : str
+             ) -> None:
+        return None
@@ -0,0 +1,54 @@
+import numpy as np
+from typing import List, Literal, Optional, Union
+
+SeedLike = Union[None, int, np.random.SeedSequence, np.random.Generator]
+_BIT_GENERATORS = {'PCG64' : np.random.PCG64, 'Philox' : np.random.Philox}
+
+def assert_params(**args):
+    if 'seed' in args and args['seed'] is not None:
+        if isinstance(args['seed'], bool) or not isinstance(args['seed'], (int, np.random.SeedSequence, np.random.Generator)):
+            raise TypeError(f"seed must be an integer, np.random.SeedSequence, np.random.Generator or None but got {type(args['seed'])}")
+    if 'bit_generator' in args:
+        if args['bit_generator'] not in _BIT_GENERATORS:
+            raise ValueError(f"bit_generator must be 'PCG64' or 'Philox' but got {args['bit_generator']}")
+    if 'n' in args:
+        if not isinstance(args['n'], int):
+            raise TypeError(f"n must be an integer but got {type(args['n'])}")
+        if args['n'] <= 0:
+            raise ValueError(f"n must be a positive integer but got {args['n']}")
+
+def make_rng(seed : SeedLike = None,
+             bit_generator : Optional[Literal['PCG64', 'Philox']] = 'PCG64'
+             ) -> np.random.Generator:
+    '''
+    Generator for a component's seed argument. A Generator is used as is, an int or SeedSequence
+    seeds a fresh PCG64/Philox stream, and None wraps the bit generator behind np.random.seed so
+    code that seeds the global state stays reproducible.
+    '''
+    assert_params(seed = seed, bit_generator = bit_generator)
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if seed is None:
+        return np.random.Generator(np.random.get_bit_generator())
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return np.random.Generator(_BIT_GENERATORS[bit_generator](seed_seq))
+
+def spawn_seeds(seed : SeedLike,
+                n : int
+                ) -> List[np.random.SeedSequence]:
+    '''n statistically independent child SeedSequences of seed (fresh entropy for None).'''
+    assert_params(seed = seed, n = n)
+    if isinstance(seed, np.random.Generator):
+        seed_seq = seed.bit_generator.seed_seq
+        # generators seeded through the legacy np.random.seed carry no SeedSequence
+        seed = seed_seq if isinstance(seed_seq, np.random.SeedSequence)\
+            else np.random.SeedSequence(seed.integers(0, 2 ** 32, size = 4, dtype = np.uint32))
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return seed_seq.spawn(n)
+
+def spawn_rngs(seed : SeedLike,
+               n : int,
+               bit_generator : Optional[Literal['PCG64', 'Philox']] = 'PCG64'
+               ) -> List[np.random.Generator]:
+    '''One independent Generator per child of spawn_seeds, e.g. one per parallel worker.'''
+    return [make_rng(seed_seq, bit_generator) for seed_seq in spawn_seeds(seed, n)]
@@ -0,0 +1,15 @@
+import os
+
+# Production switch for the argument checks (assert_params) on the hot paths. Set the
+# environment variable OPENCTRL_VALIDATE=0, or call set_validation(False), to skip them.
+# Constructors always validate; objects built with validate=True/False ignore this default.
+_VALIDATE = os.environ.get('OPENCTRL_VALIDATE', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+def set_validation(enabled : bool) -> None:
+    global _VALIDATE
+    if not isinstance(enabled, bool):
+        raise TypeError(f"enabled must be a boolean but got {type(enabled)}")
+    _VALIDATE = enabled
+
+def validation_enabled() -> bool:
+    return _VALIDATE
@@ -1,2 +1,3 @@
 from .cli import make_table
-__all__ = ["make_table"]
\ No newline at end of file
+from .plot import CostPlot
+__all__ = ["make_table", "CostPlot"]
\ No newline at end of file
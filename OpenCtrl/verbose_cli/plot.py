@@ -0,0 +1,75 @@
+import numpy as np
+from typing import Optional, Union
+
+def assert_params(**args):
+    if 'capacity' in args:
+        if not isinstance(args['capacity'], int):
+            raise TypeError(f"capacity must be an integer but got {type(args['capacity'])}")
+        if args['capacity'] <= 0:
+            raise ValueError(f"capacity must be a positive integer but got {args['capacity']}")
+    if 'plot_every' in args:
+        if not isinstance(args['plot_every'], int):
+            raise TypeError(f"plot_every must be an integer but got {type(args['plot_every'])}")
+        if args['plot_every'] <= 0:
+            raise ValueError(f"plot_every must be a positive integer but got {args['plot_every']}")
+
+class CostPlot:
+    '''
+    Decimated live plot of an optimizer's cost. record() only writes into a preallocated array;
+    the figure is redrawn every plot_every records and on flush(). matplotlib is imported on the
+    first draw, and redraws go through draw_idle/flush_events instead of plt.pause, so the
+    solver loop never sleeps. reset() starts a new history on the same figure.
+    '''
+    def __init__(self,
+                 capacity : Optional[int] = 1000,
+                 plot_every : Optional[int] = 50
+                 ) -> None:
+        assert_params(capacity = capacity, plot_every = plot_every)
+        self.costs = np.empty(capacity)
+        self.size = 0
+        self.plot_every = plot_every
+        self.horizon = None
+        self._figure = None
+        self._line = None
+
+    @property
+    def history(self) -> np.ndarray:
+        return self.costs[:self.size]
+
+    def record(self,
+               cost : float,
+               horizon : Optional[Union[int, None]] = None
+               ) -> None:
+        if self.size == len(self.costs):
+            self.costs = np.concatenate([self.costs, np.empty(len(self.costs))])
+        self.costs[self.size] = cost
+        self.size += 1
+        self.horizon = horizon
+        if self.size % self.plot_every == 0:
+            self.draw()
+
+    def reset(self) -> None:
+        '''Empty the buffer for a new solve; the figure and its line are reused on the next draw.'''
+        self.size = 0
+        self.horizon = None
+
+    def flush(self) -> None:
+        if self.size:
+            self.draw()
+
+    def draw(self) -> None:
+        import matplotlib.pyplot as plt
+        if self._figure is None or not plt.fignum_exists(self._figure.number):
+            self._figure, ax = plt.subplots()
+            self._line, = ax.plot([], [], label = 'Cost over iterations')
+            ax.set_xlabel('Iteration')
+            ax.set_ylabel('Cost')
+            self._figure.show(warn = False)
+        ax = self._line.axes
+        self._line.set_data(np.arange(self.size), self.history)
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title('Cost Minimization' if self.horizon is None
+                     else f'Cost Minimization - Horizon : {self.horizon + 1}')
+        self._figure.canvas.draw_idle()
+        self._figure.canvas.flush_events()
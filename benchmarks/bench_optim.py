@@ -0,0 +1,293 @@
+'''
+Standalone throughput benchmarks for the VanillaOptim solvers.
+
+Run from the repository root:
+    python -m benchmarks.bench_optim
+'''
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from OpenCtrl.SystemDynamicExample.linear_sys import LinearSystem
+from OpenCtrl.SystemDynamicExample.linear_sys_batch import LinearSystemBatch
+from OpenCtrl.optim.vanilla_optim import VanillaOptim
+from OpenCtrl.optim.optimizer_schema import vectorized_constraint
+from OpenCtrl.controls.lac import LAC
+from OpenCtrl.disturbances_type import meanbasline_disturbance, RollingWindow
+from OpenCtrl.verbose_cli.cli import make_table
+
+def _make_system(sys_dim : int) -> LinearSystem:
+    input_space = {str(i) : {'continuous' : [-255, 255]} for i in range(sys_dim)}
+    return LinearSystem(sys_dim = sys_dim,
+                        input_dim = sys_dim,
+                        input_space = input_space,
+                        disturbance_type = 'normal',
+                        disturbance_scale = [0, 65])
+
+def _time_solver(solver : Callable,
+                 x : np.ndarray,
+                 trials : int
+                 ) -> Dict[str, float]:
+    costs = []
+    start = time.perf_counter()
+    for _ in range(trials):
+        cost, _u = solver(x)
+        costs.append(cost)
+    elapsed = (time.perf_counter() - start) / trials
+    return {'seconds' : elapsed, 'cost_mean' : float(np.mean(costs)), 'cost_std' : float(np.std(costs))}
+
+def bench_genetic(sys_dim : Optional[int] = 8,
+                  population_size : Optional[int] = 100,
+                  max_iterations : Optional[int] = 200,
+                  trials : Optional[int] = 5,
+                  seed : Optional[int] = 0
+                  ) -> List[Dict[str, float]]:
+    '''Loop vs vectorized genetic_algorithm on a single horizon step.'''
+    system = _make_system(sys_dim)
+    x = np.random.default_rng(seed).normal(0, 65, sys_dim)
+    results = []
+    for vectorized in (False, True):
+        np.random.seed(seed)
+        optimizer = VanillaOptim(system = system,
+                                 horizon = 1,
+                                 optimizer_type = 'genetic',
+                                 population_size = population_size,
+                                 max_iterations = max_iterations,
+                                 tolerance = 1e-6,
+                                 tolerance_step = 0,
+                                 vectorized = vectorized)
+        result = _time_solver(optimizer.genetic_algorithm, x, trials)
+        result['mode'] = 'vectorized' if vectorized else 'loop'
+        results.append(result)
+    return results
+
+def bench_random(sys_dim : Optional[int] = 8,
+                 batch_size : Optional[int] = 256,
+                 max_iterations : Optional[int] = 500,
+                 trials : Optional[int] = 5,
+                 seed : Optional[int] = 0
+                 ) -> List[Dict[str, float]]:
+    '''Single-draw vs batched random_search, reported as candidate draws per second.'''
+    system = _make_system(sys_dim)
+    x = np.random.default_rng(seed).normal(0, 65, sys_dim)
+    results = []
+    for vectorized in (False, True):
+        np.random.seed(seed)
+        optimizer = VanillaOptim(system = system,
+                                 horizon = 1,
+                                 optimizer_type = 'random',
+                                 max_iterations = max_iterations,
+                                 tolerance = 1e-6,
+                                 tolerance_step = 0,
+                                 vectorized = vectorized,
+                                 batch_size = batch_size)
+        result = _time_solver(optimizer.random_search, x, trials)
+        draws = max_iterations * (batch_size if vectorized else 1)
+        result['draws_per_second'] = draws / result['seconds']
+        result['mode'] = 'vectorized' if vectorized else 'loop'
+        results.append(result)
+    return results
+
+def bench_analytic(sys_dim : Optional[int] = 8,
+                   horizon : Optional[int] = 5,
+                   max_iterations : Optional[int] = 1000,
+                   trials : Optional[int] = 5,
+                   seed : Optional[int] = 0
+                   ) -> List[Dict[str, float]]:
+    '''Per-tick optimize latency of gradient descent vs the closed-form quadratic solution.'''
+    system = _make_system(sys_dim)
+    rng = np.random.default_rng(seed)
+    preds = [rng.normal(0, 65, sys_dim) for _ in range(horizon)]
+    results = []
+    for optimizer_type in ('gradient', 'analytic'):
+        np.random.seed(seed)
+        optimizer = VanillaOptim(system = system,
+                                 horizon = horizon,
+                                 optimizer_type = optimizer_type,
+                                 max_iterations = max_iterations,
+                                 tolerance = 1e-6)
+        solver = lambda _x : (float(np.sum(optimizer.optimize(preds)[0])), None)
+        result = _time_solver(solver, system.x, trials)
+        result['mode'] = optimizer_type
+        results.append(result)
+    return results
+
+def bench_warm_start(sys_dim : Optional[int] = 8,
+                     horizon : Optional[int] = 5,
+                     ticks : Optional[int] = 50,
+                     seed : Optional[int] = 0
+                     ) -> List[Dict[str, float]]:
+    '''Closed-loop LAC.tune latency with and without reusing the previous plan.'''
+    results = []
+    for warm_start in (False, True):
+        np.random.seed(seed)
+        system = _make_system(sys_dim)
+        optimizer = VanillaOptim(system = system,
+                                 horizon = horizon,
+                                 optimizer_type = 'gradient',
+                                 alpha = 0.3,
+                                 max_iterations = 500,
+                                 tolerance = 0.5,
+                                 joint_horizon = True,
+                                 warm_start = warm_start)
+        lac = LAC(system = system, optimizer = optimizer, horizon = horizon)
+        preds = [np.full(sys_dim, 0.1) for _ in range(horizon)]
+        solver = lambda _x : (float(np.sum(lac.tune(preds = preds)[0])), None)
+        result = _time_solver(solver, system.x, ticks)
+        result['mode'] = 'warm start' if warm_start else 'cold start'
+        results.append(result)
+    return results
+
+def bench_fleet(n_systems : Optional[int] = 200,
+                sys_dim : Optional[int] = 8,
+                horizon : Optional[int] = 3,
+                ticks : Optional[int] = 5,
+                seed : Optional[int] = 0
+                ) -> List[Dict[str, float]]:
+    '''One LAC tick for n_systems plants: separate LinearSystem objects vs one LinearSystemBatch.'''
+    input_space = {str(i) : {'continuous' : [-255, 255]} for i in range(sys_dim)}
+    settings = dict(horizon = horizon, optimizer_type = 'gradient', alpha = 0.1, max_iterations = 50, tolerance = 1e-6)
+    preds = [np.random.default_rng(seed).normal(0, 1, (n_systems, sys_dim)) for _ in range(horizon)]
+    np.random.seed(seed)
+    plants = []
+    for _ in range(n_systems):
+        system = _make_system(sys_dim)
+        plants.append(LAC(system = system, optimizer = VanillaOptim(system = system, **settings), horizon = horizon))
+    loop = lambda _x : (float(np.mean([np.sum(lac.tune(preds = [p[i] for p in preds])[0])
+                                       for i, lac in enumerate(plants)])), None)
+    fleet_system = LinearSystemBatch(n_systems = n_systems, sys_dim = sys_dim, input_dim = sys_dim,
+                                     input_space = input_space, disturbance_scale = [0, 65])
+    fleet = LAC(system = fleet_system, optimizer = VanillaOptim(system = fleet_system, **settings), horizon = horizon)
+    batched = lambda _x : (float(np.mean(np.sum(fleet.tune(preds = preds)[0], axis = 0))), None)
+    results = []
+    for mode, solver in (('objects', loop), ('LinearSystemBatch', batched)):
+        result = _time_solver(solver, None, ticks)
+        result['mode'] = mode
+        results.append(result)
+    return results
+
+def _box(u, x):
+    return np.maximum(u + x - 10.0, 0.0)
+
+def bench_constraints(sys_dim : Optional[int] = 8,
+                      population_size : Optional[int] = 100,
+                      max_iterations : Optional[int] = 100,
+                      trials : Optional[int] = 3,
+                      seed : Optional[int] = 0
+                      ) -> List[Dict[str, float]]:
+    '''Vectorized genetic_algorithm with a per-row constraint vs the same vectorized_constraint.'''
+    system = _make_system(sys_dim)
+    x = np.random.default_rng(seed).normal(0, 65, sys_dim)
+    results = []
+    for mode, constraint in (('per-row', _box), ('vectorized_constraint', vectorized_constraint(lambda u, x : _box(u, x)))):
+        np.random.seed(seed)
+        optimizer = VanillaOptim(system = system,
+                                 horizon = 1,
+                                 optimizer_type = 'genetic',
+                                 population_size = population_size,
+                                 max_iterations = max_iterations,
+                                 tolerance = 1e-6,
+                                 tolerance_step = 0,
+                                 vectorized = True,
+                                 constraints = {'box' : constraint})
+        result = _time_solver(optimizer.genetic_algorithm, x, trials)
+        result['mode'] = mode
+        results.append(result)
+    return results
+
+def bench_validation(sys_dim : Optional[int] = 8,
+                     calls : Optional[int] = 100000,
+                     seed : Optional[int] = 0
+                     ) -> List[Dict[str, float]]:
+    '''Per-call cost of VanillaOptim.quadratic_cost with and without the argument checks.'''
+    system = _make_system(sys_dim)
+    rng = np.random.default_rng(seed)
+    x, u = rng.normal(0, 1, sys_dim), rng.normal(0, 1, sys_dim)
+    results = []
+    for validate in (True, False):
+        optimizer = VanillaOptim(system = system, horizon = 1, validate = validate)
+        start = time.perf_counter()
+        for _ in range(calls):
+            optimizer.quadratic_cost(x, u)
+        seconds = (time.perf_counter() - start) / calls
+        results.append({'mode' : 'validate' if validate else 'production', 'seconds' : seconds,
+                        'cost_mean' : optimizer.quadratic_cost(x, u), 'cost_std' : 0.0})
+    return results
+
+def bench_disturbance(sys_dim : Optional[int] = 8,
+                      steps : Optional[int] = 100000,
+                      seed : Optional[int] = 0
+                      ) -> List[Dict[str, float]]:
+    '''Per-step cost of LinearSystem.step with per-call draws vs a pre-drawn DisturbanceStream.'''
+    results = []
+    u = np.zeros(sys_dim)
+    for stream_block in (None, 4096):
+        np.random.seed(seed)
+        system = LinearSystem(sys_dim = sys_dim,
+                              input_dim = sys_dim,
+                              input_space = {str(i) : {'continuous' : [-255, 255]} for i in range(sys_dim)},
+                              disturbance_scale = [0, 65],
+                              stream_block = stream_block,
+                              seed = seed)
+        start = time.perf_counter()
+        for _ in range(steps):
+            system.step(u)
+        seconds = (time.perf_counter() - start) / steps
+        results.append({'mode' : 'per-step draw' if stream_block is None else 'DisturbanceStream',
+                        'seconds' : seconds, 'cost_mean' : float(np.linalg.norm(system.x)), 'cost_std' : 0.0})
+    return results
+
+def _list_window_tick(window : List[np.ndarray],
+                      phi : np.ndarray,
+                      horizon : int
+                      ) -> None:
+    '''The list-based rolling window LAC used before RollingWindow, kept for comparison.'''
+    for _ in range(horizon):
+        mean = np.mean(window, axis = 0)
+        window.pop()
+        window.append(mean)
+    window.pop(0)
+    window.append(phi)
+
+def bench_window(sys_dim : Optional[int] = 8,
+                 window_size : Optional[int] = 1000,
+                 horizon : Optional[int] = 10,
+                 ticks : Optional[int] = 2000,
+                 seed : Optional[int] = 0
+                 ) -> List[Dict[str, float]]:
+    '''mean_baseline nominal plus window update per tick: Python list window vs RollingWindow.'''
+    phis = np.random.default_rng(seed).normal(0, 1, (ticks, sys_dim))
+    results = []
+    for mode in ('list', 'RollingWindow'):
+        if mode == 'list':
+            window = [np.zeros(sys_dim) for _ in range(window_size)]
+            tick = lambda phi : _list_window_tick(window, phi, horizon)
+        else:
+            window = RollingWindow(window_size, sys_dim)
+            tick = lambda phi : (meanbasline_disturbance(horizon, window, window_size), window.push(phi))
+        start = time.perf_counter()
+        for phi in phis:
+            tick(phi)
+        seconds = (time.perf_counter() - start) / ticks
+        mean = np.mean(window, axis = 0) if mode == 'list' else window.mean()
+        results.append({'mode' : mode, 'seconds' : seconds, 'cost_mean' : float(np.linalg.norm(mean)), 'cost_std' : 0.0})
+    return results
+
+def _report(name : str,
+            results : List[Dict[str, float]]
+            ) -> str:
+    base = results[0]['seconds']
+    rows = [[r['mode'], f"{r['seconds'] * 1e3:.2f}", f"{base / r['seconds']:.1f}x",
+             f"{r['cost_mean']:.4f} +/- {r['cost_std']:.4f}",
+             f"{r['draws_per_second']:.3g}" if 'draws_per_second' in r else '-'] for r in results]
+    return f"{name}\n" + make_table(['MODE', 'MS / SOLVE', 'SPEEDUP', 'BEST COST', 'DRAWS / S'], rows)
+
+if __name__ == "__main__":
+    print(_report('genetic_algorithm', bench_genetic()))
+    print(_report('random_search', bench_random()))
+    print(_report('optimize (quadratic)', bench_analytic()))
+    print(_report('LAC.tune (joint gradient)', bench_warm_start()))
+    print(_report('fleet LAC.tune (200 plants)', bench_fleet()))
+    print(_report('genetic_algorithm with constraints', bench_constraints()))
+    print(_report('quadratic_cost per call', bench_validation()))
+    print(_report('LinearSystem.step', bench_disturbance()))
+    print(_report('mean_baseline window (1000 entries)', bench_window()))
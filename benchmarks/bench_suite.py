@@ -0,0 +1,170 @@
+'''
+Parameter sweep over VanillaOptim.optimize latency and LAC.tune throughput, with peak memory,
+written as JSON so runs from different releases can be compared.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --quick --baseline bench.json --tolerance 0.25
+'''
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+import tracemalloc
+import numpy as np
+from typing import Callable, Dict, List, Optional
+import OpenCtrl
+from OpenCtrl.optim.vanilla_optim import VanillaOptim
+from OpenCtrl.controls.lac import LAC
+from OpenCtrl.verbose_cli.cli import make_table
+from .bench_optim import _make_system
+
+GRID = {'optimizer_type' : ['gradient', 'genetic', 'random', 'analytic', 'momentum', 'nesterov', 'adam', 'projected'],
+        'sys_dim' : [4, 16, 64],
+        'horizon' : [1, 5, 10],
+        'population_size' : [50, 200],
+        'max_iterations' : [50, 200]}
+QUICK_GRID = {'optimizer_type' : ['gradient', 'genetic', 'random', 'analytic', 'momentum', 'nesterov', 'adam', 'projected'],
+              'sys_dim' : [4, 16],
+              'horizon' : [1, 5],
+              'population_size' : [50],
+              'max_iterations' : [50]}
+
+def _cases(grid : Dict[str, List]) -> List[Dict]:
+    '''Cartesian product of grid; population_size only varies for the genetic optimizer.'''
+    cases = []
+    for values in itertools.product(*grid.values()):
+        case = dict(zip(grid.keys(), values))
+        if case['optimizer_type'] != 'genetic':
+            if case['population_size'] != grid['population_size'][0]:
+                continue
+            case.pop('population_size')
+        cases.append(case)
+    return cases
+
+def _measure(fn : Callable,
+             repeats : int
+             ) -> Dict[str, float]:
+    '''Wall-clock percentiles over repeats calls, then one traced call for peak memory.'''
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    times = np.array(times)
+    return {'median_ms' : float(np.median(times) * 1e3),
+            'p95_ms' : float(np.percentile(times, 95) * 1e3),
+            'peak_kib' : peak / 1024}
+
+def _optimizer(case : Dict,
+               system
+               ) -> VanillaOptim:
+    return VanillaOptim(system = system,
+                        tolerance = 1e-9,
+                        tolerance_step = 0,
+                        vectorized = True,
+                        seed = 0,
+                        **case)
+
+def bench_optimize(case : Dict,
+                   repeats : Optional[int] = 5
+                   ) -> Dict:
+    system = _make_system(case['sys_dim'])
+    optimizer = _optimizer({k : v for k, v in case.items() if k != 'sys_dim'}, system)
+    preds = np.random.default_rng(0).normal(0, 65, (case['horizon'], case['sys_dim']))
+    result = _measure(lambda : optimizer.optimize(preds), repeats)
+    result['kind'] = 'optimize'
+    result.update(case)
+    return result
+
+def bench_tune(case : Dict,
+               ticks : Optional[int] = 20,
+               repeats : Optional[int] = 3
+               ) -> Dict:
+    system = _make_system(case['sys_dim'])
+    optimizer = _optimizer({k : v for k, v in case.items() if k != 'sys_dim'}, system)
+    lac = LAC(system = system, optimizer = optimizer, horizon = case['horizon'],
+              nominal_disturbance = 'mean_baseline', seed = 0)
+    preds = np.random.default_rng(0).normal(0, 65, (case['horizon'], case['sys_dim']))
+    def run():
+        for _ in range(ticks):
+            lac.tune(preds = preds)
+    result = _measure(run, repeats)
+    result['ticks_per_second'] = ticks / (result['median_ms'] / 1e3)
+    result['kind'] = 'tune'
+    result.update(case)
+    return result
+
+def run_suite(grid : Optional[Dict[str, List]] = None,
+              repeats : Optional[int] = 5,
+              ticks : Optional[int] = 20
+              ) -> Dict:
+    grid = GRID if grid is None else grid
+    results = []
+    for case in _cases(grid):
+        results.append(bench_optimize(case, repeats))
+        results.append(bench_tune(case, ticks, max(repeats // 2, 1)))
+    return {'meta' : {'openctrl' : OpenCtrl.__version__,
+                      'numpy' : np.__version__,
+                      'python' : platform.python_version(),
+                      'machine' : platform.machine(),
+                      'timestamp' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+                      'grid' : grid},
+            'results' : results}
+
+def _key(result : Dict) -> tuple:
+    return tuple((k, result[k]) for k in ('kind', 'optimizer_type', 'sys_dim', 'horizon',
+                                           'population_size', 'max_iterations') if k in result)
+
+def compare(current : Dict,
+            baseline : Dict,
+            tolerance : Optional[float] = 0.25
+            ) -> List[Dict]:
+    '''Cases whose median latency grew by more than tolerance (a fraction) over baseline.'''
+    previous = {_key(r) : r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(_key(result))
+        if old is not None and result['median_ms'] > old['median_ms'] * (1 + tolerance):
+            regressions.append({'case' : dict(_key(result)),
+                                'baseline_ms' : old['median_ms'],
+                                'median_ms' : result['median_ms']})
+    return regressions
+
+def _summary(report : Dict) -> str:
+    rows = [[r['kind'], r['optimizer_type'], r['sys_dim'], r['horizon'], r.get('population_size', '-'),
+             r['max_iterations'], f"{r['median_ms']:.2f}", f"{r['p95_ms']:.2f}",
+             f"{r['ticks_per_second']:.1f}" if 'ticks_per_second' in r else '-', f"{r['peak_kib']:.0f}"]
+            for r in report['results']]
+    return make_table(['KIND', 'OPTIMIZER', 'DIM', 'H', 'POP', 'ITERS', 'MEDIAN MS', 'P95 MS', 'TICKS / S', 'PEAK KIB'], rows)
+
+def main(argv : Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action = 'store_true', help = 'run the reduced grid')
+    parser.add_argument('--repeats', type = int, default = 5)
+    parser.add_argument('--ticks', type = int, default = 20)
+    parser.add_argument('--output', help = 'write the JSON report here')
+    parser.add_argument('--baseline', help = 'JSON report to compare against')
+    parser.add_argument('--tolerance', type = float, default = 0.25, help = 'allowed median slowdown, as a fraction')
+    args = parser.parse_args(argv)
+    report = run_suite(QUICK_GRID if args.quick else GRID, args.repeats, args.ticks)
+    print(_summary(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent = 2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"regression {regression['case']}: {regression['baseline_ms']:.2f} ms -> {regression['median_ms']:.2f} ms")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,30 @@
 import pytest
 from typing import Callable
-from OpenCtrl.controls.test import _test_lac_1
+from OpenCtrl.controls.test import _test_lac_1, test_lac_fleet, test_lac_seeded, test_lac_recorder, test_lac_array_preds, test_lac_dcl, test_lac_vector_psi, test_lac_profiler, test_lac_time_budget
 from OpenCtrl.optim.test import (
     test_optimizer_schema,
     test_vanilla_optim,
+    test_vanilla_optim_vectorized,
+    test_vanilla_optim_analytic,
+    test_vanilla_optim_joint_horizon,
+    test_vanilla_optim_warm_start,
+    test_vanilla_optim_constraints,
+    test_vanilla_optim_validation,
+    test_vanilla_optim_plot,
+    test_vanilla_optim_stopping,
+    test_vanilla_optim_time_budget,
+    test_vanilla_optim_first_order,
+    test_vanilla_optim_restarts,
 )
 from OpenCtrl.SystemDynamicExample.test import (
     test_base_system_initialization,
-    test_linear_system_initialization
+    test_linear_system_initialization,
+    test_linear_system_batch,
+    test_disturbance_stream,
+    test_input_space_table
 )
-from OpenCtrl.disturbances_type.test import _test_all
+from OpenCtrl.disturbances_type.test import _test_all, test_rolling_window, test_ema_closed_form
+from OpenCtrl.parallel.test import test_episode_runner
 
 def call(obj : Callable):
     if isinstance(obj, list):
@@ -25,10 +40,35 @@ if __name__ == "__main__":
     tests = [
         test_base_system_initialization,
         test_linear_system_initialization,
+        test_linear_system_batch,
+        test_disturbance_stream,
+        test_input_space_table,
         _test_all,
+        test_rolling_window,
+        test_ema_closed_form,
         test_optimizer_schema,
         test_vanilla_optim,
-        _test_lac_1
+        test_vanilla_optim_vectorized,
+        test_vanilla_optim_analytic,
+        test_vanilla_optim_joint_horizon,
+        test_vanilla_optim_warm_start,
+        test_vanilla_optim_constraints,
+        test_vanilla_optim_validation,
+        test_vanilla_optim_plot,
+        test_vanilla_optim_stopping,
+        test_vanilla_optim_time_budget,
+        test_vanilla_optim_first_order,
+        test_vanilla_optim_restarts,
+        _test_lac_1,
+        test_lac_fleet,
+        test_lac_seeded,
+        test_lac_recorder,
+        test_lac_array_preds,
+        test_lac_dcl,
+        test_lac_vector_psi,
+        test_lac_profiler,
+        test_lac_time_budget,
+        test_episode_runner
     ]
     for test in tests:
         call(test)